@@ -3,13 +3,19 @@ Agents package for Smart Study Assistant.
 """
 
 from .coordinator import CoordinatorAgent
-from .study_planner import StudyPlannerAgent
+from .study_planner import StudyPlannerAgent, StudyPlan
 from .question_answerer import QuestionAnswererAgent
-from .progress_tracker import ProgressTrackerAgent
+from .progress_tracker import ProgressTrackerAgent, ProgressEntry
+from .session import new_session, dump_session, load_session
 
 __all__ = [
     'CoordinatorAgent',
     'StudyPlannerAgent',
     'QuestionAnswererAgent',
-    'ProgressTrackerAgent'
+    'ProgressTrackerAgent',
+    'StudyPlan',
+    'ProgressEntry',
+    'new_session',
+    'dump_session',
+    'load_session'
 ]
@@ -0,0 +1,111 @@
+"""
+Gemini context caching for the agents' static instructions.
+
+This registers an agent's fixed instruction block as server-side cached
+content, so each call only sends the per-request part of the prompt.
+Cached content expires after its TTL, so the models returned here extend
+it shortly before that happens.
+"""
+
+import logging
+import threading
+import time
+from datetime import timedelta
+
+logger = logging.getLogger(__name__)
+
+# Cached content is renewed this long before Gemini would expire it
+_RENEW_MARGIN = timedelta(minutes=5)
+
+
+class CachedInstructionModel:
+    """
+    Gemini model bound to cached content holding its system instruction.
+
+    Calls are forwarded to the underlying GenerativeModel. The first call
+    after the renewal point extends the cached content's TTL, or recreates
+    the content if Gemini no longer has it, so the model keeps working for
+    as long as the process runs.
+    """
+
+    __slots__ = ('model_name', 'system_instruction', '_ttl', '_cache', '_model', '_renew_at', '_lock')
+
+    def __init__(self, model_name: str, system_instruction: str, ttl: timedelta):
+        """
+        Create the cached content and the model bound to it.
+
+        Args:
+            model_name: Gemini model to cache the instruction for
+            system_instruction: Static instruction block to cache
+            ttl: How long Gemini should keep the cached content
+        """
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self._ttl = ttl
+        self._lock = threading.Lock()  # agents may call from several threads
+        self._create()
+
+    def generate_content(self, *args, **kwargs):
+        """Forward to GenerativeModel.generate_content, renewing the cache if due."""
+        return self._current().generate_content(*args, **kwargs)
+
+    async def generate_content_async(self, *args, **kwargs):
+        """Forward to GenerativeModel.generate_content_async, renewing the cache if due."""
+        return await self._current().generate_content_async(*args, **kwargs)
+
+    def _current(self):
+        """Return the bound model, renewing the cached content first if it is due."""
+        with self._lock:
+            if time.monotonic() >= self._renew_at:
+                try:
+                    self._cache.update(ttl=self._ttl)
+                    self._schedule_renewal()
+                    logger.info("Extended cached instructions %s", self._cache.name)
+                except Exception as e:
+                    logger.warning("Could not extend cached instructions for %s, recreating them: %s",
+                                   self.model_name, e)
+                    self._create()
+            return self._model
+
+    def _create(self) -> None:
+        """Register the instruction as cached content and bind a model to it."""
+        import google.generativeai as genai
+        from google.generativeai import caching
+
+        self._cache = caching.CachedContent.create(
+            model=self.model_name,
+            system_instruction=self.system_instruction,
+            ttl=self._ttl
+        )
+        self._model = genai.GenerativeModel.from_cached_content(cached_content=self._cache)
+        self._schedule_renewal()
+        logger.info("Cached instructions for %s as %s", self.model_name, self._cache.name)
+
+    def _schedule_renewal(self) -> None:
+        """Set when the cached content should next be renewed."""
+        lifetime = max(self._ttl - _RENEW_MARGIN, self._ttl / 2)
+        self._renew_at = time.monotonic() + lifetime.total_seconds()
+
+
+def create_cached_model(model_name: str, system_instruction: str, ttl: timedelta = timedelta(hours=1)):
+    """
+    Create a Gemini model whose system instruction lives in the context cache.
+
+    Gemini only caches content above a minimum token count and only for
+    models that support caching, so failures are expected and not fatal.
+
+    Args:
+        model_name: Gemini model to cache the instruction for
+        system_instruction: Static instruction block to cache
+        ttl: How long Gemini should keep the cached content between renewals
+
+    Returns:
+        A CachedInstructionModel, or None if caching is unavailable and the
+        caller should send full prompts instead
+    """
+    try:
+        return CachedInstructionModel(model_name, system_instruction, ttl)
+
+    except Exception as e:
+        logger.warning("Context caching unavailable for %s, sending full prompts: %s", model_name, e)
+        return None
@@ -4,11 +4,94 @@ Coordinator Agent - Routes requests to appropriate specialist agents.
 This demonstrates LLM-powered dynamic routing in a multi-agent system.
 """
 
+import hashlib
+import json
 import logging
-from typing import Dict
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .progress_tracker import ProgressTrackerAgent
+from .question_answerer import QuestionAnswererAgent
+from .study_planner import StudyPlannerAgent
 
 logger = logging.getLogger(__name__)
 
+# Keyword signals used to route obvious requests without an LLM call.
+# One named group per agent, so a single finditer() pass scores them all.
+_ROUTE_RE = re.compile(
+    r'(?P<study_planner>\b(?:plan|planning|schedule|prepare for|exam in)\b)'
+    r'|(?P<progress_tracker>\b(?:completed|finished|studied|revised|took\b[^?!\n]{0,40}?\bhours?)\b)'
+    r'|(?P<question_answerer>\?|\b(?:what|how|why|explain|difference)\b)',
+    re.I
+)
+
+# Agents in the order their signals are reported (ties go to the first)
+_ROUTE_AGENTS = ('study_planner', 'progress_tracker', 'question_answerer')
+
+# Maximum number of classifications remembered per cache
+_ROUTE_CACHE_SIZE = 512
+
+# Words that carry no routing signal and are dropped from fingerprints
+_FINGERPRINT_STOPWORDS = frozenset({
+    'a', 'an', 'the', 'is', 'are', 's', 'of', 'to', 'in', 'on', 'and',
+    'or', 'i', 'me', 'my', 'it', 'this', 'that', 'do', 'does', 'please'
+})
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+_AGENT_NAME_RE = re.compile(r'study_planner|question_answerer|progress_tracker')
+
+# Ask Gemini for a JSON body when classifying and answering in one call
+_JSON_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+# What each specialist handles, shared by the routing prompts
+_AGENT_DESCRIPTIONS = """1. study_planner - Creates study schedules, plans learning paths, organizes study time
+2. question_answerer - Answers questions about topics, explains concepts, provides information
+3. progress_tracker - Tracks study progress, records completed tasks, analyzes performance"""
+
+# Prompt templates keep their static instructions first so the prefix is
+# identical across calls; only the user request is substituted at the end.
+_ROUTE_PROMPT_TEMPLATE = """You are a coordinator for a study assistant system. 
+Analyze the following user request and determine which specialist agent should handle it.
+
+Available agents:
+""" + _AGENT_DESCRIPTIONS + """
+
+Respond with ONLY ONE of these exact words: study_planner, question_answerer, or progress_tracker
+
+User request: "{user_input}"
+"""
+
+# The fused prompt reuses each specialist's own instructions, followed by
+# the request with the session context that specialist would add to it
+_FUSED_PROMPT_PREFIX = """You are a study assistant with three specialist roles.
+First decide which role should handle the user request, then respond to the request in that role.
+
+Roles:
+{descriptions}
+
+Instructions for study_planner:
+{study_planner}
+
+Instructions for question_answerer:
+{question_answerer}
+
+Instructions for progress_tracker:
+{progress_tracker}
+
+Respond with a JSON object of the form {{"agent": "<role>", "message": "<your response>"}}
+where <role> is exactly one of: study_planner, question_answerer, progress_tracker
+
+The request, with the context each role would see:
+""".format(
+    descriptions=_AGENT_DESCRIPTIONS,
+    study_planner=StudyPlannerAgent.SYSTEM_INSTRUCTION,
+    question_answerer=QuestionAnswererAgent.SYSTEM_INSTRUCTION,
+    progress_tracker=ProgressTrackerAgent.SYSTEM_INSTRUCTION
+)
+
 
 class CoordinatorAgent:
     """
@@ -27,9 +110,28 @@ class CoordinatorAgent:
             model: Gemini model instance for LLM-powered reasoning
         """
         self.model = model
+        
+        # LRU caches of previous classifications: exact input and fingerprint
+        self._route_cache: OrderedDict[str, str] = OrderedDict()
+        self._fingerprint_cache: OrderedDict[str, str] = OrderedDict()
+        self._cache_lock = threading.Lock()  # requests may be classified from several threads
+        
+        # Dispatch tables: agent name -> call into that specialist
+        self._dispatch = {
+            'study_planner': lambda agents, u, s, cb: agents['study_planner'].create_plan(u, s, cb),
+            'question_answerer': lambda agents, u, s, cb: agents['question_answerer'].answer_question(u, s, cb),
+            'progress_tracker': lambda agents, u, s, cb: agents['progress_tracker'].track_progress(u, s, cb),
+        }
+        self._async_dispatch = {
+            'study_planner': lambda agents, u, s: agents['study_planner'].create_plan_async(u, s),
+            'question_answerer': lambda agents, u, s: agents['question_answerer'].answer_question_async(u, s),
+            'progress_tracker': lambda agents, u, s: agents['progress_tracker'].track_progress_async(u, s),
+        }
+        
         logger.info("Coordinator Agent initialized")
     
-    def route_request(self, user_input: str, session_memory: Dict, agents: Dict) -> Dict:
+    def route_request(self, user_input: str, session_memory: Dict, agents: Dict,
+                      on_chunk: Optional[Callable[[str], None]] = None) -> Dict:
         """
         Analyze the user request and route it to the appropriate specialist agent.
         
@@ -42,64 +144,361 @@ class CoordinatorAgent:
             user_input: The user's request
             session_memory: Session memory for context
             agents: Dictionary of available specialist agents
+            on_chunk: Optional callback that receives the response text as it
+                streams in from the specialist
             
         Returns:
             Dictionary containing the response and metadata
         """
-        logger.info(f"Routing request: {user_input}")
-        
-        # Create a prompt for the LLM to classify the request
-        prompt = f"""You are a coordinator for a study assistant system. 
-Analyze the following user request and determine which specialist agent should handle it.
-
-Available agents:
-1. study_planner - Creates study schedules, plans learning paths, organizes study time
-2. question_answerer - Answers questions about topics, explains concepts, provides information
-3. progress_tracker - Tracks study progress, records completed tasks, analyzes performance
-
-User request: "{user_input}"
-
-Respond with ONLY ONE of these exact words: study_planner, question_answerer, or progress_tracker
-"""
+        logger.info("Routing request: %s", user_input)
         
         try:
-            # Use LLM to determine the appropriate agent
-            response = self.model.generate_content(prompt)
-            agent_type = response.text.strip().lower()
-            
-            # Clean up the response (sometimes LLM adds extra text)
-            if 'study_planner' in agent_type or 'study' in agent_type and 'plan' in agent_type:
-                agent_type = 'study_planner'
-            elif 'question' in agent_type or 'answer' in agent_type:
-                agent_type = 'question_answerer'
-            elif 'progress' in agent_type or 'track' in agent_type:
-                agent_type = 'progress_tracker'
-            
-            # Validate the response
-            valid_agents = ['study_planner', 'question_answerer', 'progress_tracker']
-            if agent_type not in valid_agents:
-                # Default to question answerer if unclear
-                logger.warning(f"Invalid agent type returned: {agent_type}, defaulting to question_answerer")
-                agent_type = 'question_answerer'
-            
-            logger.info(f"Request routed to: {agent_type}")
+            agent_type, cache_keys = self._classify_locally(user_input, session_memory.get('last_agent'))
+            
+            if agent_type is None:
+                # Ambiguous request: classify and answer in a single LLM call
+                response = self.model.generate_content(
+                    self._build_fused_prompt(user_input, session_memory, agents),
+                    generation_config=_JSON_GENERATION_CONFIG
+                )
+                fused = self._parse_fused_response(response.text, cache_keys)
+                if fused is not None:
+                    if on_chunk is not None:
+                        # JSON output can't be streamed; hand over the message whole
+                        on_chunk(fused[1])
+                    return self._apply_fused_response(*fused, user_input, session_memory, agents)
+                
+                # Fall back to the split path: classify first, then ask the specialist
+                response = self.model.generate_content(self._build_classifier_prompt(user_input))
+                agent_type = self._parse_classification(response.text, cache_keys)
             
             # Route to the appropriate agent and get the response
-            if agent_type == 'study_planner':
-                return agents['study_planner'].create_plan(user_input, session_memory)
-            elif agent_type == 'question_answerer':
-                return agents['question_answerer'].answer_question(user_input, session_memory)
-            elif agent_type == 'progress_tracker':
-                return agents['progress_tracker'].track_progress(user_input, session_memory)
-            else:
-                # Fallback to question answerer
-                return agents['question_answerer'].answer_question(user_input, session_memory)
+            return self._dispatch[agent_type](agents, user_input, session_memory, on_chunk)
+            
+        except Exception as e:
+            return self._error_response(e)
+    
+    async def route_request_async(self, user_input: str, session_memory: Dict, agents: Dict) -> Dict:
+        """
+        Async variant of route_request that awaits the Gemini async API.
+        
+        Args:
+            user_input: The user's request
+            session_memory: Session memory for context
+            agents: Dictionary of available specialist agents
+            
+        Returns:
+            Dictionary containing the response and metadata
+        """
+        logger.info("Routing request: %s", user_input)
+        
+        try:
+            agent_type, cache_keys = self._classify_locally(user_input, session_memory.get('last_agent'))
+            
+            if agent_type is None:
+                response = await self.model.generate_content_async(
+                    self._build_fused_prompt(user_input, session_memory, agents),
+                    generation_config=_JSON_GENERATION_CONFIG
+                )
+                fused = self._parse_fused_response(response.text, cache_keys)
+                if fused is not None:
+                    return self._apply_fused_response(*fused, user_input, session_memory, agents)
+                
+                response = await self.model.generate_content_async(self._build_classifier_prompt(user_input))
+                agent_type = self._parse_classification(response.text, cache_keys)
+            
+            return await self._async_dispatch[agent_type](agents, user_input, session_memory)
             
         except Exception as e:
-            logger.error(f"Error in routing: {e}")
-            # Return error response
-            return {
-                'status': 'error',
-                'agent_used': 'coordinator',
-                'message': f'Unable to route request: {str(e)}'
-            }
+            return self._error_response(e)
+    
+    def classify(self, user_input: str, last_agent: Optional[str] = None) -> str:
+        """
+        Decide which specialist agent should handle a request.
+        
+        Obvious requests are routed locally by keyword; only ambiguous
+        ones are sent to the LLM for classification.
+        
+        Args:
+            user_input: The user's request
+            last_agent: Agent that handled the previous turn, if any
+            
+        Returns:
+            Name of the specialist agent
+        """
+        agent_type, cache_keys = self._classify_locally(user_input, last_agent)
+        if agent_type is not None:
+            return agent_type
+        
+        # Use LLM to determine the appropriate agent
+        response = self.model.generate_content(self._build_classifier_prompt(user_input))
+        return self._parse_classification(response.text, cache_keys)
+    
+    async def classify_async(self, user_input: str, last_agent: Optional[str] = None) -> str:
+        """
+        Async variant of classify that awaits the Gemini async API.
+        
+        Args:
+            user_input: The user's request
+            last_agent: Agent that handled the previous turn, if any
+            
+        Returns:
+            Name of the specialist agent
+        """
+        agent_type, cache_keys = self._classify_locally(user_input, last_agent)
+        if agent_type is not None:
+            return agent_type
+        
+        response = await self.model.generate_content_async(self._build_classifier_prompt(user_input))
+        return self._parse_classification(response.text, cache_keys)
+    
+    def guess(self, user_input: str) -> Optional[str]:
+        """
+        Make a quick keyword guess at the route, e.g. to start work early.
+        
+        Unlike classify this never calls the LLM and may be wrong for
+        mixed requests; the strongest keyword signal wins.
+        
+        Args:
+            user_input: The user's request
+            
+        Returns:
+            Name of the most likely specialist agent, or None if no keywords match
+        """
+        matches = self._signal_scores(user_input)
+        if not matches:
+            return None
+        return max(matches, key=lambda match: match[1])[0]
+    
+    def _classify_locally(self, user_input: str,
+                          last_agent: Optional[str] = None) -> Tuple[Optional[str], Tuple[str, str]]:
+        """
+        Try to classify a request by keyword, from the route caches, or as
+        a continuation of the previous turn.
+        
+        Keywords are checked first: they are cheaper than the cache keys,
+        and a clear keyword signal must win over a cached near-duplicate.
+        
+        Args:
+            user_input: The user's request
+            last_agent: Agent that handled the previous turn, if any
+            
+        Returns:
+            Tuple of (agent name or None, cache keys for storing the LLM result;
+            empty when routed by keyword)
+        """
+        agent_type = self._fast_classify(user_input)
+        if agent_type is not None:
+            logger.info("Request routed to: %s (keyword match)", agent_type)
+            return agent_type, ('', '')
+        
+        exact_key = hashlib.blake2b(user_input.lower().strip().encode(), digest_size=16).hexdigest()
+        fingerprint = self._fingerprint(user_input)
+        
+        agent_type = self._cache_get(self._route_cache, exact_key)
+        if agent_type is None and fingerprint:
+            agent_type = self._cache_get(self._fingerprint_cache, fingerprint)
+        if agent_type is not None:
+            logger.info("Request routed to: %s (cached)", agent_type)
+        elif self._same_route_heuristic(user_input, last_agent):
+            # Not cached: the decision depends on the previous turn
+            agent_type = last_agent
+            logger.info("Request routed to: %s (same as last turn)", agent_type)
+        return agent_type, (exact_key, fingerprint)
+    
+    def _build_classifier_prompt(self, user_input: str) -> str:
+        """Create a prompt for the LLM to classify the request."""
+        return _ROUTE_PROMPT_TEMPLATE.format(user_input=user_input)
+    
+    def _build_fused_prompt(self, user_input: str, session_memory: Dict, agents: Dict) -> str:
+        """
+        Create a prompt that both classifies the request and answers it.
+        
+        Args:
+            user_input: The user's request
+            session_memory: Session memory for context
+            agents: Dictionary of available specialist agents
+            
+        Returns:
+            Prompt to send to the LLM
+        """
+        requests = (
+            ('study_planner', agents['study_planner'].build_request(user_input, session_memory)),
+            ('question_answerer', agents['question_answerer'].build_request(user_input, session_memory)),
+            # The update is only recorded once the progress tracker is chosen
+            ('progress_tracker', agents['progress_tracker'].build_request(
+                user_input, session_memory, recorded=False
+            ))
+        )
+        return _FUSED_PROMPT_PREFIX + ''.join(
+            f"\n[{agent_type}]\n{request}" for agent_type, request in requests
+        )
+    
+    def _parse_fused_response(self, text: str, cache_keys: Tuple[str, str]) -> Optional[Tuple[str, str]]:
+        """
+        Extract the agent name and message from a fused JSON response.
+        
+        Args:
+            text: Raw LLM response text
+            cache_keys: Exact-input and fingerprint cache keys for the request
+            
+        Returns:
+            Tuple of (agent name, message), or None if the response is unusable
+        """
+        try:
+            data = json.loads(text)
+        except ValueError:
+            logger.warning("Fused response was not valid JSON, falling back to separate calls")
+            return None
+        
+        if not isinstance(data, dict):
+            return None
+        message = data.get('message')
+        if not isinstance(message, str) or not message.strip():
+            logger.warning("Fused response had no message, falling back to separate calls")
+            return None
+        
+        agent_type = self._parse_classification(str(data.get('agent', '')), cache_keys)
+        return agent_type, message
+    
+    def _apply_fused_response(self, agent_type: str, message: str, user_input: str,
+                              session_memory: Dict, agents: Dict) -> Dict:
+        """
+        Record a fused response with the specialist it was generated for.
+        
+        The specialist applies the same session memory updates it would have
+        made had it generated the message itself.
+        """
+        if agent_type == 'progress_tracker':
+            agents['progress_tracker'].record_progress(user_input, session_memory)
+        return agents[agent_type].handle_response(user_input, message, session_memory)
+    
+    def _parse_classification(self, text: str, cache_keys: Tuple[str, str]) -> str:
+        """
+        Turn the LLM's classification into an agent name and cache it.
+        
+        Args:
+            text: Raw LLM response text
+            cache_keys: Exact-input and fingerprint cache keys for the request
+            
+        Returns:
+            Name of the specialist agent
+        """
+        # Pick the agent name out of the response (sometimes LLM adds extra text)
+        match = _AGENT_NAME_RE.search(text.lower())
+        if match:
+            agent_type = match.group(0)
+        else:
+            # Default to question answerer if unclear
+            logger.warning("Invalid agent type returned: %s, defaulting to question_answerer", text.strip())
+            agent_type = 'question_answerer'
+        
+        logger.info("Request routed to: %s (LLM)", agent_type)
+        
+        exact_key, fingerprint = cache_keys
+        self._cache_put(self._route_cache, exact_key, agent_type)
+        if fingerprint:
+            self._cache_put(self._fingerprint_cache, fingerprint, agent_type)
+        return agent_type
+    
+    def _error_response(self, error: Exception) -> Dict:
+        """Log a routing failure and build the error response."""
+        logger.error("Error in routing: %s", error)
+        return {
+            'status': 'error',
+            'agent_used': 'coordinator',
+            'message': f'Unable to route request: {str(error)}'
+        }
+    
+    def _fast_classify(self, user_input: str) -> Optional[str]:
+        """
+        Route a request by keyword when the intent is unambiguous.
+        
+        Args:
+            user_input: The user's request
+            
+        Returns:
+            Name of the specialist agent, or None if the LLM should decide
+        """
+        matches = self._signal_scores(user_input)
+        
+        # Only trust the keywords when exactly one kind of signal is present
+        if len(matches) == 1:
+            return matches[0][0]
+        return None
+    
+    def _same_route_heuristic(self, user_input: str, last_agent: Optional[str]) -> bool:
+        """
+        Check whether a mixed-signal request continues the previous turn.
+        
+        Follow-ups usually stay with the same specialist, so the previous
+        route is reused when its keywords clearly dominate the request.
+        
+        Args:
+            user_input: The user's request
+            last_agent: Agent that handled the previous turn, if any
+            
+        Returns:
+            True if the request should go to last_agent without an LLM call
+        """
+        if last_agent is None:
+            return False
+        
+        matches = sorted(self._signal_scores(user_input), key=lambda match: match[1], reverse=True)
+        if not matches or matches[0][0] != last_agent:
+            return False
+        return len(matches) == 1 or matches[0][1] > matches[1][1]
+    
+    def _signal_scores(self, user_input: str) -> List[Tuple[str, int]]:
+        """Count keyword hits per agent, keeping only agents with a hit."""
+        scores = dict.fromkeys(_ROUTE_AGENTS, 0)
+        for match in _ROUTE_RE.finditer(user_input):
+            scores[match.lastgroup] += 1
+        return [(agent_type, score) for agent_type, score in scores.items() if score > 0]
+    
+    def _fingerprint(self, user_input: str) -> str:
+        """
+        Build a lightweight fingerprint so near-duplicate phrasings share a route.
+        
+        The fingerprint is the sorted set of crudely stemmed content words.
+        Routing keywords are kept like any other word, and a question mark
+        is kept as its own token, so requests with different intent signals
+        never share a fingerprint.
+        
+        Args:
+            user_input: The user's request
+            
+        Returns:
+            Fingerprint string (empty if the request has no content words)
+        """
+        tokens = set()
+        for token in _TOKEN_RE.findall(user_input.lower()):
+            if token in _FINGERPRINT_STOPWORDS:
+                continue
+            for suffix in ('ing', 'ed', 's'):
+                if len(token) > len(suffix) + 2 and token.endswith(suffix):
+                    token = token[:-len(suffix)]
+                    break
+            tokens.add(token)
+        
+        if not tokens:
+            return ''
+        if '?' in user_input:
+            tokens.add('?')
+        return ' '.join(sorted(tokens))
+    
+    def _cache_get(self, cache: OrderedDict, key: str) -> Optional[str]:
+        """Look up a cached route and mark it as recently used."""
+        with self._cache_lock:
+            agent_type = cache.get(key)
+            if agent_type is not None:
+                cache.move_to_end(key)
+            return agent_type
+    
+    def _cache_put(self, cache: OrderedDict, key: str, agent_type: str) -> None:
+        """Store a route, evicting the least recently used entry when full."""
+        with self._cache_lock:
+            cache[key] = agent_type
+            cache.move_to_end(key)
+            if len(cache) > _ROUTE_CACHE_SIZE:
+                cache.popitem(last=False)
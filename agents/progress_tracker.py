@@ -5,12 +5,42 @@ This is a specialist agent that monitors learning progress and provides insights
 """
 
 import logging
+import time
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict
+from itertools import islice
+from typing import Callable, Dict, Optional
+
+from .streaming import generate_text
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class ProgressEntry:
+    """A single progress update stored in session memory."""
+    timestamp_ns: int  # time.time_ns(); formatted only when reported
+    update: str
+
+
+# Static analysis instructions, followed by the per-request part of the prompt
+_PROGRESS_INSTRUCTIONS = """You are a supportive study coach analyzing a student's progress.
+
+Provide an encouraging response that:
+1. Acknowledges the progress made
+2. Provides positive reinforcement
+3. Offers insights or suggestions for continued improvement
+4. Identifies any patterns or trends (if applicable)
+5. Suggests next steps or areas to focus on
+
+Be encouraging, specific, and actionable in your feedback."""
+
+_PROGRESS_REQUEST_TEMPLATE = """Latest progress update: "{user_input}"
+{context}
+"""
+
+
 class ProgressTrackerAgent:
     """
     Progress Tracker Agent that monitors and analyzes student study progress.
@@ -21,17 +51,25 @@ class ProgressTrackerAgent:
     - Data analysis and insights generation
     """
     
-    def __init__(self, model):
+    # Can be registered as Gemini cached content (see agents.context_cache)
+    SYSTEM_INSTRUCTION = _PROGRESS_INSTRUCTIONS
+    
+    def __init__(self, model, instructions_cached: bool = False):
         """
         Initialize the Progress Tracker Agent.
         
         Args:
             model: Gemini model instance for LLM-powered analysis
+            instructions_cached: True if the model already carries
+                SYSTEM_INSTRUCTION as cached content, so prompts only
+                need the per-request part
         """
         self.model = model
+        self.instructions_cached = instructions_cached
         logger.info("Progress Tracker Agent initialized")
     
-    def track_progress(self, user_input: str, session_memory: Dict) -> Dict:
+    def track_progress(self, user_input: str, session_memory: Dict,
+                       on_chunk: Optional[Callable[[str], None]] = None) -> Dict:
         """
         Track and analyze student progress.
         
@@ -43,76 +81,147 @@ class ProgressTrackerAgent:
         Args:
             user_input: User's progress update
             session_memory: Session memory for context
+            on_chunk: Optional callback that receives the analysis text as it streams in
             
         Returns:
             Dictionary containing progress analysis and metadata
         """
         logger.info("Tracking progress...")
+        self.record_progress(user_input, session_memory)
+        prompt = self.build_prompt(user_input, session_memory)
+        
+        try:
+            # Use LLM to analyze progress
+            text = generate_text(self.model, prompt, on_chunk)
+            return self.handle_response(user_input, text, session_memory)
+            
+        except Exception as e:
+            return self._error_response(e)
+    
+    async def track_progress_async(self, user_input: str, session_memory: Dict) -> Dict:
+        """
+        Async variant of track_progress that awaits the Gemini async API.
         
+        Args:
+            user_input: User's progress update
+            session_memory: Session memory for context
+            
+        Returns:
+            Dictionary containing progress analysis and metadata
+        """
+        logger.info("Tracking progress...")
+        self.record_progress(user_input, session_memory)
+        prompt = self.build_prompt(user_input, session_memory)
+        
+        try:
+            response = await self.model.generate_content_async(prompt)
+            return self.handle_response(user_input, response.text, session_memory)
+            
+        except Exception as e:
+            return self._error_response(e)
+    
+    def record_progress(self, user_input: str, session_memory: Dict) -> None:
+        """
+        Store a progress update in session memory.
+        
+        Args:
+            user_input: User's progress update
+            session_memory: Session memory to update
+        """
         # Create progress entry
-        progress_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'update': user_input
-        }
+        progress_entry = ProgressEntry(timestamp_ns=time.time_ns(), update=user_input)
         
-        # Store in session memory
+        # Store in session memory, plus a small window of the latest updates
         session_memory['progress_history'].append(progress_entry)
+        session_memory.setdefault('recent_updates', deque(maxlen=3)).append(user_input)
+    
+    def build_prompt(self, user_input: str, session_memory: Dict) -> str:
+        """
+        Build the progress analysis prompt for an update.
+        
+        The update is expected to be recorded already (see record_progress).
+        
+        Args:
+            user_input: User's progress update
+            session_memory: Session memory for context
+            
+        Returns:
+            Prompt to send to the LLM
+        """
+        request = self.build_request(user_input, session_memory)
+        if self.instructions_cached:
+            return request
+        return _PROGRESS_INSTRUCTIONS + "\n\n" + request
+    
+    def build_request(self, user_input: str, session_memory: Dict, recorded: bool = True) -> str:
+        """
+        Build the per-request part of the progress analysis prompt (what
+        follows SYSTEM_INSTRUCTION).
         
+        Args:
+            user_input: User's progress update
+            session_memory: Session memory for context
+            recorded: Whether the update is already in session memory; if
+                not, the context describes the history as if it were
+            
+        Returns:
+            The update and its session context
+        """
         # Get historical context
-        progress_history = session_memory.get('progress_history', [])
-        study_plans = session_memory.get('study_plans', [])
+        total = len(session_memory.get('progress_history', ())) + (not recorded)
+        study_plans = session_memory.get('study_plans', ())
         
         # Build context for analysis
         context = f"""
-Progress history: {len(progress_history)} entries recorded
+Progress history: {total} entries recorded
 Active study plans: {len(study_plans)}
 """
         
-        if len(progress_history) > 1:
+        # Entries before the current one (recent_updates keeps the last
+        # three, including the current one once it is recorded)
+        recent_updates = session_memory.get('recent_updates', ())
+        recent_count = len(recent_updates)
+        start, stop = (0, recent_count - 1) if recorded else (max(recent_count - 2, 0), recent_count)
+        if stop > start:
             context += f"\nPrevious progress updates:\n"
-            for entry in progress_history[-3:-1]:  # Last 2 entries before current
-                context += f"- {entry['update']}\n"
+            for update in islice(recent_updates, start, stop):
+                context += f"- {update}\n"
         
-        prompt = f"""You are a supportive study coach analyzing a student's progress.
-
-Latest progress update: "{user_input}"
-{context}
-
-Provide an encouraging response that:
-1. Acknowledges the progress made
-2. Provides positive reinforcement
-3. Offers insights or suggestions for continued improvement
-4. Identifies any patterns or trends (if applicable)
-5. Suggests next steps or areas to focus on
-
-Be encouraging, specific, and actionable in your feedback.
-"""
+        return _PROGRESS_REQUEST_TEMPLATE.format(user_input=user_input, context=context)
+    
+    def handle_response(self, user_input: str, analysis_content: str, session_memory: Dict) -> Dict:
+        """
+        Build the agent response for a generated progress analysis.
         
-        try:
-            # Use LLM to analyze progress
-            response = self.model.generate_content(prompt)
-            analysis_content = response.text
-            
-            # Calculate simple statistics
-            total_entries = len(progress_history)
-            
-            logger.info(f"Progress tracked successfully. Total entries: {total_entries}")
-            
-            return {
-                'status': 'success',
-                'agent_used': 'progress_tracker',
-                'message': analysis_content,
-                'total_progress_entries': total_entries,
-                'progress_recorded': True
-            }
+        Args:
+            user_input: User's progress update
+            analysis_content: Analysis text generated by the LLM
+            session_memory: Session memory containing progress history
             
-        except Exception as e:
-            logger.error(f"Error tracking progress: {e}")
-            return {
-                'status': 'error',
-                'agent_used': 'progress_tracker',
-                'message': f'Unable to track progress: {str(e)}'
-            }
+        Returns:
+            Dictionary containing progress analysis and metadata
+        """
+        # Calculate simple statistics
+        total_entries = len(session_memory.get('progress_history', ()))
+        
+        logger.info("Progress tracked successfully. Total entries: %s", total_entries)
+        
+        return {
+            'status': 'success',
+            'agent_used': 'progress_tracker',
+            'message': analysis_content,
+            'total_progress_entries': total_entries,
+            'progress_recorded': True
+        }
+    
+    def _error_response(self, error: Exception) -> Dict:
+        """Log a tracking failure and build the error response."""
+        logger.error("Error tracking progress: %s", error)
+        return {
+            'status': 'error',
+            'agent_used': 'progress_tracker',
+            'message': f'Unable to track progress: {str(error)}'
+        }
     
     def get_progress_summary(self, session_memory: Dict) -> Dict:
         """
@@ -137,12 +246,9 @@ Be encouraging, specific, and actionable in your feedback.
         # Calculate statistics
         total_entries = len(progress_history)
         
-        # Get date range
-        if progress_history:
-            first_entry = progress_history[0]['timestamp']
-            last_entry = progress_history[-1]['timestamp']
-        else:
-            first_entry = last_entry = 'N/A'
+        # Get date range (history is non-empty here)
+        first_entry = datetime.fromtimestamp(progress_history[0].timestamp_ns / 1e9).isoformat()
+        last_entry = datetime.fromtimestamp(progress_history[-1].timestamp_ns / 1e9).isoformat()
         
         return {
             'total_entries': total_entries,
@@ -5,10 +5,30 @@ This is a specialist agent that provides detailed explanations and answers.
 """
 
 import logging
-from typing import Dict
+import re
+from itertools import chain
+from typing import Callable, Dict, Optional
+
+from .streaming import generate_text
 
 logger = logging.getLogger(__name__)
 
+# Static tutoring instructions, followed by the per-request part of the prompt
+_ANSWER_INSTRUCTIONS = """You are a knowledgeable and patient tutor helping a student learn.
+
+Provide a clear, detailed answer that:
+1. Directly answers the question
+2. Explains the concept in simple terms
+3. Provides examples where helpful
+4. Suggests related topics to explore
+5. Encourages the student's learning
+
+Be educational, encouraging, and thorough in your explanation."""
+
+_ANSWER_REQUEST_TEMPLATE = """Student's question: "{user_input}"
+{context}
+"""
+
 
 class QuestionAnswererAgent:
     """
@@ -20,17 +40,38 @@ class QuestionAnswererAgent:
     - Educational explanation generation
     """
     
-    def __init__(self, model):
+    # Keyword lookup used by get_related_topics
+    _KEYWORDS_TO_TOPICS = {
+        'python': ['variables', 'functions', 'loops', 'data structures'],
+        'list': ['arrays', 'tuples', 'dictionaries', 'sets'],
+        'function': ['parameters', 'return values', 'scope', 'recursion'],
+        'loop': ['for loops', 'while loops', 'iteration', 'break and continue'],
+        'class': ['objects', 'inheritance', 'methods', 'attributes']
+    }
+    
+    # One alternation over all keywords, matched at word starts so plurals
+    # such as "lists" or "classes" still count
+    _KEYWORD_RE = re.compile(r'\b(' + '|'.join(map(re.escape, _KEYWORDS_TO_TOPICS)) + r')', re.I)
+    
+    # Can be registered as Gemini cached content (see agents.context_cache)
+    SYSTEM_INSTRUCTION = _ANSWER_INSTRUCTIONS
+    
+    def __init__(self, model, instructions_cached: bool = False):
         """
         Initialize the Question Answerer Agent.
         
         Args:
             model: Gemini model instance for LLM-powered answering
+            instructions_cached: True if the model already carries
+                SYSTEM_INSTRUCTION as cached content, so prompts only
+                need the per-request part
         """
         self.model = model
+        self.instructions_cached = instructions_cached
         logger.info("Question Answerer Agent initialized")
     
-    def answer_question(self, user_input: str, session_memory: Dict) -> Dict:
+    def answer_question(self, user_input: str, session_memory: Dict,
+                        on_chunk: Optional[Callable[[str], None]] = None) -> Dict:
         """
         Answer a student's question with detailed explanation.
         
@@ -39,6 +80,29 @@ class QuestionAnswererAgent:
         - Context integration from session memory
         - Structured answer generation
         
+        Args:
+            user_input: Student's question
+            session_memory: Session memory for context
+            on_chunk: Optional callback that receives the answer text as it streams in
+            
+        Returns:
+            Dictionary containing the answer and metadata
+        """
+        logger.info("Answering question...")
+        prompt = self.build_prompt(user_input, session_memory)
+        
+        try:
+            # Use LLM to generate the answer
+            text = generate_text(self.model, prompt, on_chunk)
+            return self.handle_response(user_input, text, session_memory)
+            
+        except Exception as e:
+            return self._error_response(e)
+    
+    async def answer_question_async(self, user_input: str, session_memory: Dict) -> Dict:
+        """
+        Async variant of answer_question that awaits the Gemini async API.
+        
         Args:
             user_input: Student's question
             session_memory: Session memory for context
@@ -47,56 +111,87 @@ class QuestionAnswererAgent:
             Dictionary containing the answer and metadata
         """
         logger.info("Answering question...")
+        prompt = self.build_prompt(user_input, session_memory)
         
+        try:
+            response = await self.model.generate_content_async(prompt)
+            return self.handle_response(user_input, response.text, session_memory)
+            
+        except Exception as e:
+            return self._error_response(e)
+    
+    def build_prompt(self, user_input: str, session_memory: Dict) -> str:
+        """
+        Build the tutoring prompt for a question.
+        
+        Args:
+            user_input: Student's question
+            session_memory: Session memory for context
+            
+        Returns:
+            Prompt to send to the LLM
+        """
+        request = self.build_request(user_input, session_memory)
+        if self.instructions_cached:
+            return request
+        return _ANSWER_INSTRUCTIONS + "\n\n" + request
+    
+    def build_request(self, user_input: str, session_memory: Dict) -> str:
+        """
+        Build the per-request part of the tutoring prompt (what follows
+        SYSTEM_INSTRUCTION).
+        
+        Args:
+            user_input: Student's question
+            session_memory: Session memory for context
+            
+        Returns:
+            The question and its session context
+        """
         # Extract context from session memory
-        conversation_history = session_memory.get('conversation_history', [])
+        turn_count = session_memory.get('turn_count', 0)
         study_plans = session_memory.get('study_plans', [])
         
         # Build context from recent interactions
         context = ""
         if study_plans:
             recent_plan = study_plans[-1]
-            context += f"\nStudent is currently studying: {recent_plan.get('request', 'various topics')}"
+            context += f"\nStudent is currently studying: {recent_plan.request or 'various topics'}"
         
-        if len(conversation_history) > 0:
-            context += f"\nThis is interaction #{len(conversation_history) + 1} in this session"
+        if turn_count > 0:
+            context += f"\nThis is interaction #{turn_count} in this session"
         
-        prompt = f"""You are a knowledgeable and patient tutor helping a student learn.
-
-Student's question: "{user_input}"
-{context}
-
-Provide a clear, detailed answer that:
-1. Directly answers the question
-2. Explains the concept in simple terms
-3. Provides examples where helpful
-4. Suggests related topics to explore
-5. Encourages the student's learning
-
-Be educational, encouraging, and thorough in your explanation.
-"""
+        return _ANSWER_REQUEST_TEMPLATE.format(user_input=user_input, context=context)
+    
+    def handle_response(self, user_input: str, answer_content: str, session_memory: Dict) -> Dict:
+        """
+        Build the agent response for a generated answer.
         
-        try:
-            # Use LLM to generate the answer
-            response = self.model.generate_content(prompt)
-            answer_content = response.text
-            
-            logger.info("Question answered successfully")
-            
-            return {
-                'status': 'success',
-                'agent_used': 'question_answerer',
-                'message': answer_content,
-                'question': user_input
-            }
+        Args:
+            user_input: Student's question
+            answer_content: Answer text generated by the LLM
+            session_memory: Session memory (unused, kept for a uniform interface)
             
-        except Exception as e:
-            logger.error(f"Error answering question: {e}")
-            return {
-                'status': 'error',
-                'agent_used': 'question_answerer',
-                'message': f'Unable to answer question: {str(e)}'
-            }
+        Returns:
+            Dictionary containing the answer and metadata
+        """
+        logger.info("Question answered successfully")
+        
+        return {
+            'status': 'success',
+            'agent_used': 'question_answerer',
+            'message': answer_content,
+            'question': user_input
+        }
+    
+    def _error_response(self, error: Exception) -> Dict:
+        """Log an answering failure and build the error response."""
+        logger.error("Error answering question: %s", error)
+        return {
+            'status': 'error',
+            'agent_used': 'question_answerer',
+            'message': f'Unable to answer question: {str(error)}'
+        }
     
     def get_related_topics(self, question: str) -> list:
         """
@@ -112,20 +207,11 @@ Be educational, encouraging, and thorough in your explanation.
         """
         # Simple keyword-based related topics
         # In a real implementation, this could use more sophisticated NLP
+        hits = {keyword.lower() for keyword in self._KEYWORD_RE.findall(question)}
         
-        keywords_to_topics = {
-            'python': ['variables', 'functions', 'loops', 'data structures'],
-            'list': ['arrays', 'tuples', 'dictionaries', 'sets'],
-            'function': ['parameters', 'return values', 'scope', 'recursion'],
-            'loop': ['for loops', 'while loops', 'iteration', 'break and continue'],
-            'class': ['objects', 'inheritance', 'methods', 'attributes']
-        }
-        
-        question_lower = question.lower()
-        related = []
-        
-        for keyword, topics in keywords_to_topics.items():
-            if keyword in question_lower:
-                related.extend(topics)
+        # dict.fromkeys de-duplicates while keeping keyword order stable
+        related = dict.fromkeys(chain.from_iterable(
+            topics for keyword, topics in self._KEYWORDS_TO_TOPICS.items() if keyword in hits
+        ))
         
-        return list(set(related))[:5]  # Return up to 5 unique topics
+        return list(related)[:5]  # Return up to 5 unique topics
@@ -0,0 +1,97 @@
+"""
+Session memory creation and serialization.
+
+Session memory holds only ints, strings, deques and slotted dataclasses,
+so it serializes directly with orjson; the standard json module is used
+when orjson is not installed.
+"""
+
+import json
+from collections import deque
+from dataclasses import asdict, is_dataclass
+from typing import Dict
+
+from .progress_tracker import ProgressEntry
+from .study_planner import StudyPlan
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+# Bounded histories and their sizes, so long sessions don't grow forever
+_DEQUE_LIMITS = {
+    'conversation_history': 500,
+    'study_plans': 100,
+    'progress_history': 500,
+    'recent_updates': 3
+}
+
+
+def new_session() -> Dict:
+    """
+    Create empty session memory.
+
+    Returns:
+        Session memory dictionary shared by the agents
+    """
+    session = {key: deque(maxlen=limit) for key, limit in _DEQUE_LIMITS.items()}
+    session.update({
+        'plan_count': 0,
+        'turn_count': 0,
+        'last_agent': None,  # specialist that handled the previous turn
+        'user_profile': {}
+    })
+    return session
+
+
+def _default(obj):
+    """Convert values the JSON encoders don't handle natively."""
+    if isinstance(obj, deque):
+        return list(obj)
+    if is_dataclass(obj):
+        return asdict(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def dump_session(session: Dict) -> bytes:
+    """
+    Serialize session memory to JSON.
+
+    Args:
+        session: Session memory to serialize
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(session, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(session, default=_default, separators=(',', ':')).encode()
+
+
+def load_session(data: bytes) -> Dict:
+    """
+    Rebuild session memory from dump_session output.
+
+    Args:
+        data: JSON produced by dump_session
+
+    Returns:
+        Session memory with its deques and entries restored
+    """
+    raw = orjson.loads(data) if orjson is not None else json.loads(data)
+
+    session = new_session()
+    session.update(raw)
+    for key, limit in _DEQUE_LIMITS.items():
+        session[key] = deque(raw.get(key, ()), maxlen=limit)
+
+    session['study_plans'] = deque(
+        (StudyPlan(**plan) for plan in session['study_plans']),
+        maxlen=_DEQUE_LIMITS['study_plans']
+    )
+    session['progress_history'] = deque(
+        (ProgressEntry(**entry) for entry in session['progress_history']),
+        maxlen=_DEQUE_LIMITS['progress_history']
+    )
+    return session
@@ -0,0 +1,31 @@
+"""
+Text generation helper shared by the specialist agents.
+
+This lets an agent stream Gemini's output to the caller as it arrives,
+while still returning the complete text for session memory.
+"""
+
+from typing import Callable, Optional
+
+
+def generate_text(model, prompt: str, on_chunk: Optional[Callable[[str], None]] = None) -> str:
+    """
+    Generate a response, optionally streaming it chunk by chunk.
+
+    Args:
+        model: Gemini model instance
+        prompt: Prompt to send
+        on_chunk: Called with each piece of text as it arrives; if None the
+            response is requested in one piece
+
+    Returns:
+        The full response text
+    """
+    if on_chunk is None:
+        return model.generate_content(prompt).text
+
+    chunks = []
+    for chunk in model.generate_content(prompt, stream=True):
+        on_chunk(chunk.text)
+        chunks.append(chunk.text)
+    return ''.join(chunks)
@@ -5,12 +5,71 @@ This is a specialist agent that uses LLM reasoning combined with custom tools.
 """
 
 import logging
-from datetime import datetime, timedelta
-from typing import Dict
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from .streaming import generate_text
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class StudyPlan:
+    """A generated study plan stored in session memory."""
+    plan_id: int
+    created_at_ns: int  # time.time_ns()
+    request: str
+    plan_content: str
+    status: str = 'active'
+
+
+# Static planning instructions, followed by the per-request part of the prompt
+_PLAN_INSTRUCTIONS = """You are an expert study planner helping a student create an effective study schedule.
+
+Create a detailed, personalized study plan that includes:
+1. Overall strategy and approach
+2. Daily breakdown of topics to study
+3. Time allocation for each topic
+4. Study techniques and tips
+5. Milestones and checkpoints
+
+Provide a comprehensive, actionable study plan in a clear format."""
+
+_PLAN_REQUEST_TEMPLATE = """User request: "{user_input}"
+{context}
+"""
+
+# Study tips per topic category, joined once at import for get_study_tips
+_TIPS_JOINED = {
+    key: '\n'.join(tips) for key, tips in {
+        'programming': [
+            'Practice coding daily, even if just for 30 minutes',
+            'Work on small projects to apply concepts',
+            'Use debugging as a learning tool',
+            'Read other people\'s code to learn different approaches'
+        ],
+        'mathematics': [
+            'Practice problems regularly',
+            'Understand concepts before memorizing formulas',
+            'Work through examples step by step',
+            'Create summary sheets for quick review'
+        ],
+        'languages': [
+            'Practice speaking daily',
+            'Immerse yourself in the language (media, books)',
+            'Use spaced repetition for vocabulary',
+            'Focus on practical conversation skills'
+        ]
+    }.items()
+}
+_TIPS_KEYS = tuple(_TIPS_JOINED)
+
+# Words in a planning request that signal an upcoming exam
+_EXAM_RE = re.compile(r'\b(?:exam|test|quiz|midterm|final)s?\b', re.I)
+
+
 class StudyPlannerAgent:
     """
     Study Planner Agent that creates personalized study schedules
@@ -22,17 +81,25 @@ class StudyPlannerAgent:
     - Memory integration
     """
     
-    def __init__(self, model):
+    # Can be registered as Gemini cached content (see agents.context_cache)
+    SYSTEM_INSTRUCTION = _PLAN_INSTRUCTIONS
+    
+    def __init__(self, model, instructions_cached: bool = False):
         """
         Initialize the Study Planner Agent.
         
         Args:
             model: Gemini model instance for LLM-powered planning
+            instructions_cached: True if the model already carries
+                SYSTEM_INSTRUCTION as cached content, so prompts only
+                need the per-request part
         """
         self.model = model
+        self.instructions_cached = instructions_cached
         logger.info("Study Planner Agent initialized")
     
-    def create_plan(self, user_input: str, session_memory: Dict) -> Dict:
+    def create_plan(self, user_input: str, session_memory: Dict,
+                    on_chunk: Optional[Callable[[str], None]] = None) -> Dict:
         """
         Create a personalized study plan based on user requirements.
         
@@ -41,6 +108,29 @@ class StudyPlannerAgent:
         - Integration with session memory
         - Custom tool usage (schedule creation)
         
+        Args:
+            user_input: User's study planning request
+            session_memory: Session memory for context
+            on_chunk: Optional callback that receives the plan text as it streams in
+            
+        Returns:
+            Dictionary containing the study plan and metadata
+        """
+        logger.info("Creating study plan...")
+        prompt = self.build_prompt(user_input, session_memory)
+        
+        try:
+            # Use LLM to generate the study plan
+            text = generate_text(self.model, prompt, on_chunk)
+            return self.handle_response(user_input, text, session_memory)
+            
+        except Exception as e:
+            return self._error_response(e)
+    
+    async def create_plan_async(self, user_input: str, session_memory: Dict) -> Dict:
+        """
+        Async variant of create_plan that awaits the Gemini async API.
+        
         Args:
             user_input: User's study planning request
             session_memory: Session memory for context
@@ -49,7 +139,43 @@ class StudyPlannerAgent:
             Dictionary containing the study plan and metadata
         """
         logger.info("Creating study plan...")
+        prompt = self.build_prompt(user_input, session_memory)
+        
+        try:
+            response = await self.model.generate_content_async(prompt)
+            return self.handle_response(user_input, response.text, session_memory)
+            
+        except Exception as e:
+            return self._error_response(e)
+    
+    def build_prompt(self, user_input: str, session_memory: Dict) -> str:
+        """
+        Build the planning prompt for a request.
+        
+        Args:
+            user_input: User's study planning request
+            session_memory: Session memory for context
+            
+        Returns:
+            Prompt to send to the LLM
+        """
+        request = self.build_request(user_input, session_memory)
+        if self.instructions_cached:
+            return request
+        return _PLAN_INSTRUCTIONS + "\n\n" + request
+    
+    def build_request(self, user_input: str, session_memory: Dict) -> str:
+        """
+        Build the per-request part of the planning prompt (what follows
+        SYSTEM_INSTRUCTION).
         
+        Args:
+            user_input: User's study planning request
+            session_memory: Session memory for context
+            
+        Returns:
+            The request and its session context
+        """
         # Extract context from session memory
         previous_plans = session_memory.get('study_plans', [])
         user_profile = session_memory.get('user_profile', {})
@@ -61,57 +187,56 @@ class StudyPlannerAgent:
         if user_profile:
             context += f"\nUser profile: {user_profile}"
         
-        prompt = f"""You are an expert study planner helping a student create an effective study schedule.
-
-User request: "{user_input}"
-{context}
-
-Create a detailed, personalized study plan that includes:
-1. Overall strategy and approach
-2. Daily breakdown of topics to study
-3. Time allocation for each topic
-4. Study techniques and tips
-5. Milestones and checkpoints
-
-Provide a comprehensive, actionable study plan in a clear format.
-"""
+        return _PLAN_REQUEST_TEMPLATE.format(user_input=user_input, context=context)
+    
+    def handle_response(self, user_input: str, plan_content: str, session_memory: Dict) -> Dict:
+        """
+        Store a generated plan in session memory and build the agent response.
         
-        try:
-            # Use LLM to generate the study plan
-            response = self.model.generate_content(prompt)
-            plan_content = response.text
-            
-            # Create structured plan object
-            study_plan = {
-                'created_at': datetime.now().isoformat(),
-                'request': user_input,
-                'plan_content': plan_content,
-                'status': 'active'
-            }
-            
-            # Store in session memory (demonstrates memory management)
-            session_memory['study_plans'].append(study_plan)
-            
-            # Update user profile if new information is available
-            if 'exam' in user_input.lower() or 'test' in user_input.lower():
-                session_memory['user_profile']['has_upcoming_exam'] = True
-            
-            logger.info("Study plan created successfully")
-            
-            return {
-                'status': 'success',
-                'agent_used': 'study_planner',
-                'message': plan_content,
-                'plan_id': len(session_memory['study_plans']) - 1
-            }
+        Args:
+            user_input: User's study planning request
+            plan_content: Plan text generated by the LLM
+            session_memory: Session memory to update
             
-        except Exception as e:
-            logger.error(f"Error creating study plan: {e}")
-            return {
-                'status': 'error',
-                'agent_used': 'study_planner',
-                'message': f'Unable to create study plan: {str(e)}'
-            }
+        Returns:
+            Dictionary containing the study plan and metadata
+        """
+        # Plan ids come from a counter because old plans may be evicted
+        plan_id = session_memory.get('plan_count', 0)
+        session_memory['plan_count'] = plan_id + 1
+        
+        # Create structured plan object
+        study_plan = StudyPlan(
+            plan_id=plan_id,
+            created_at_ns=time.time_ns(),
+            request=user_input,
+            plan_content=plan_content
+        )
+        
+        # Store in session memory (demonstrates memory management)
+        session_memory['study_plans'].append(study_plan)
+        
+        # Update user profile if new information is available
+        if _EXAM_RE.search(user_input):
+            session_memory['user_profile']['has_upcoming_exam'] = True
+        
+        logger.info("Study plan created successfully")
+        
+        return {
+            'status': 'success',
+            'agent_used': 'study_planner',
+            'message': plan_content,
+            'plan_id': plan_id
+        }
+    
+    def _error_response(self, error: Exception) -> Dict:
+        """Log a planning failure and build the error response."""
+        logger.error("Error creating study plan: %s", error)
+        return {
+            'status': 'error',
+            'agent_used': 'study_planner',
+            'message': f'Unable to create study plan: {str(error)}'
+        }
     
     def get_study_tips(self, topic: str) -> str:
         """
@@ -125,31 +250,10 @@ Provide a comprehensive, actionable study plan in a clear format.
         Returns:
             Study tips as a string
         """
-        # This is a simple custom tool implementation
-        tips = {
-            'programming': [
-                'Practice coding daily, even if just for 30 minutes',
-                'Work on small projects to apply concepts',
-                'Use debugging as a learning tool',
-                'Read other people\'s code to learn different approaches'
-            ],
-            'mathematics': [
-                'Practice problems regularly',
-                'Understand concepts before memorizing formulas',
-                'Work through examples step by step',
-                'Create summary sheets for quick review'
-            ],
-            'languages': [
-                'Practice speaking daily',
-                'Immerse yourself in the language (media, books)',
-                'Use spaced repetition for vocabulary',
-                'Focus on practical conversation skills'
-            ]
-        }
-        
         # Return relevant tips or general tips
-        for key in tips:
-            if key in topic.lower():
-                return '\n'.join(tips[key])
+        topic = topic.lower()
+        for key in _TIPS_KEYS:
+            if key in topic:
+                return _TIPS_JOINED[key]
         
         return "Study consistently, take breaks, and review regularly."
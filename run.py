@@ -23,20 +23,42 @@ try:
     from agents.study_planner import StudyPlannerAgent
     from agents.question_answerer import QuestionAnswererAgent
     from agents.progress_tracker import ProgressTrackerAgent
+    from agents.context_cache import create_cached_model
+    from agents.session import new_session
+    import asyncio
+    import atexit
     import logging
-    from datetime import datetime
+    import logging.handlers
+    import queue
+    import time
     
     # Load environment variables
     load_dotenv()
     
-    # Configure logging
+    # Configure logging: records are queued and written by a background
+    # listener thread, so file and console I/O stays off the request path.
+    # INFO goes to the file only; the console just shows warnings and
+    # errors, so log lines don't land in the middle of the demo's output.
+    log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler = logging.FileHandler('study_assistant.log')
+    file_handler.setFormatter(log_formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setLevel(logging.WARNING)
+    stream_handler.setFormatter(log_formatter)
+    
+    log_queue = queue.Queue(-1)
+    log_listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+    log_listener.start()
+    atexit.register(log_listener.stop)
+    
+    # The queue handler only merges the message; the listener's handlers
+    # apply the full format when they write the record
     logging.basicConfig(
         level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('study_assistant.log'),
-            logging.StreamHandler()
-        ]
+        format='%(message)s',
+        handlers=[logging.handlers.QueueHandler(log_queue)]
     )
     
     logger = logging.getLogger(__name__)
@@ -52,29 +74,40 @@ try:
             genai.configure(api_key=api_key)
             self.model = genai.GenerativeModel('gemini-1.5-flash')
             
-            # Initialize session memory
-            self.session_memory = {
-                'conversation_history': [],
-                'study_plans': [],
-                'progress_history': [],
-                'user_profile': {}
-            }
+            # Initialize session memory (bounded so long sessions don't grow forever)
+            self.session_memory = new_session()
             
-            # Initialize agents
+            # Initialize agents (specialists can keep their static instructions
+            # in Gemini's context cache when GEMINI_CONTEXT_CACHE=1)
+            use_context_cache = os.getenv('GEMINI_CONTEXT_CACHE') == '1'
             self.coordinator = CoordinatorAgent(self.model)
-            self.study_planner = StudyPlannerAgent(self.model)
-            self.question_answerer = QuestionAnswererAgent(self.model)
-            self.progress_tracker = ProgressTrackerAgent(self.model)
+            self.study_planner = self._create_specialist(StudyPlannerAgent, use_context_cache)
+            self.question_answerer = self._create_specialist(QuestionAnswererAgent, use_context_cache)
+            self.progress_tracker = self._create_specialist(ProgressTrackerAgent, use_context_cache)
             
             logger.info("Smart Study Assistant initialized successfully!")
         
-        def process_request(self, user_input: str) -> dict:
-            """Process a user request through the coordinator agent."""
-            logger.info(f"Processing request: {user_input}")
+        def _create_specialist(self, agent_class, use_context_cache: bool):
+            """Create a specialist agent, on a context-cached model if possible."""
+            if use_context_cache:
+                cached_model = create_cached_model(self.model.model_name, agent_class.SYSTEM_INSTRUCTION)
+                if cached_model is not None:
+                    return agent_class(cached_model, instructions_cached=True)
+            return agent_class(self.model)
+        
+        def process_request(self, user_input: str, on_chunk=None) -> dict:
+            """
+            Process a user request through the coordinator agent.
             
-            # Add to conversation history
+            If on_chunk is given it is called with the response text as it
+            streams in, so the caller can show it before the request finishes.
+            """
+            logger.info("Processing request: %s", user_input)
+            
+            # Add to conversation history and count the turn
+            self.session_memory['turn_count'] += 1
             self.session_memory['conversation_history'].append({
-                'timestamp': datetime.now().isoformat(),
+                'timestamp_ns': time.time_ns(),
                 'input': user_input
             })
             
@@ -82,20 +115,66 @@ try:
             response = self.coordinator.route_request(
                 user_input,
                 self.session_memory,
-                {
-                    'study_planner': self.study_planner,
-                    'question_answerer': self.question_answerer,
-                    'progress_tracker': self.progress_tracker
-                }
+                self._agents(),
+                on_chunk
             )
             
+            self._remember_route(response)
             return response
         
+        async def process_batch(self, inputs: list, max_concurrency: int = 10) -> list:
+            """
+            Process several independent requests concurrently.
+            
+            Gemini calls are awaited through the async API, so the batch takes
+            roughly as long as its slowest request instead of the sum of all.
+            Responses are returned in the same order as the inputs.
+            """
+            semaphore = asyncio.Semaphore(max_concurrency)
+            
+            async def run_one(user_input):
+                async with semaphore:
+                    return await self.process_request_async(user_input)
+            
+            return list(await asyncio.gather(*[run_one(x) for x in inputs]))
+        
+        async def process_request_async(self, user_input: str) -> dict:
+            """Async variant of process_request that awaits the Gemini async API."""
+            logger.info("Processing request: %s", user_input)
+            
+            self.session_memory['turn_count'] += 1
+            self.session_memory['conversation_history'].append({
+                'timestamp_ns': time.time_ns(),
+                'input': user_input
+            })
+            
+            response = await self.coordinator.route_request_async(
+                user_input,
+                self.session_memory,
+                self._agents()
+            )
+            
+            self._remember_route(response)
+            return response
+        
+        def _remember_route(self, response: dict) -> None:
+            """Remember which specialist answered so follow-ups can reuse the route."""
+            if response.get('status') == 'success':
+                self.session_memory['last_agent'] = response['agent_used']
+        
+        def _agents(self) -> dict:
+            """Specialist agents available to the coordinator."""
+            return {
+                'study_planner': self.study_planner,
+                'question_answerer': self.question_answerer,
+                'progress_tracker': self.progress_tracker
+            }
+        
         def get_session_summary(self) -> dict:
             """Get a summary of the current session."""
             return {
-                'total_interactions': len(self.session_memory['conversation_history']),
-                'study_plans_created': len(self.session_memory['study_plans']),
+                'total_interactions': self.session_memory['turn_count'],
+                'study_plans_created': self.session_memory['plan_count'],
                 'progress_entries': len(self.session_memory['progress_history'])
             }
     
@@ -124,56 +203,52 @@ try:
         print("✅ Assistant ready!")
         print()
         
-        # Demo 1: Study Planning
-        print("=" * 70)
-        print("📝 DEMO 1: Creating a Study Plan")
-        print("=" * 70)
-        print()
-        print("User: I need to prepare for my Python exam in 2 weeks. I can study 2 hours daily.")
-        print()
-        
-        response1 = assistant.process_request(
-            "I need to prepare for my Python exam in 2 weeks. I can study 2 hours daily."
-        )
-        
-        print(f"Agent: {response1.get('agent_used', 'unknown')}")
-        print()
-        print(response1.get('message', 'No response'))
-        print()
+        demos = [
+            ("📝 DEMO 1: Creating a Study Plan",
+             "I need to prepare for my Python exam in 2 weeks. I can study 2 hours daily."),
+            ("❓ DEMO 2: Answering a Question",
+             "What is the difference between a list and a tuple in Python?"),
+            ("📊 DEMO 3: Tracking Progress",
+             "I completed studying variables and data types today. It took 1.5 hours."),
+        ]
         
-        # Demo 2: Question Answering
+        # The plan is created first so the later demos see it in session memory.
+        # Its text is printed as it streams in rather than after the full reply.
+        title, prompt = demos[0]
         print("=" * 70)
-        print("❓ DEMO 2: Answering a Question")
+        print(title)
         print("=" * 70)
         print()
-        print("User: What is the difference between a list and a tuple in Python?")
+        print(f"User: {prompt}")
         print()
+        streamed = []
         
-        response2 = assistant.process_request(
-            "What is the difference between a list and a tuple in Python?"
-        )
+        def show_chunk(text):
+            streamed.append(text)
+            print(text, end='', flush=True)
         
-        print(f"Agent: {response2.get('agent_used', 'unknown')}")
-        print()
-        print(response2.get('message', 'No response'))
+        response = assistant.process_request(prompt, on_chunk=show_chunk)
+        if not streamed:
+            print(response.get('message', 'No response'), end='')
         print()
-        
-        # Demo 3: Progress Tracking
-        print("=" * 70)
-        print("📊 DEMO 3: Tracking Progress")
-        print("=" * 70)
         print()
-        print("User: I completed studying variables and data types today. It took 1.5 hours.")
+        print(f"Agent: {response.get('agent_used', 'unknown')}")
         print()
         
-        response3 = assistant.process_request(
-            "I completed studying variables and data types today. It took 1.5 hours."
-        )
+        # The remaining requests only read the plan, so they run concurrently
+        responses = asyncio.run(assistant.process_batch([prompt for _, prompt in demos[1:]]))
         
-        print(f"Agent: {response3.get('agent_used', 'unknown')}")
-        print()
-        print(response3.get('message', 'No response'))
-        print()
+        for (title, prompt), response in zip(demos[1:], responses):
+            print("=" * 70)
+            print(title)
+            print("=" * 70)
+            print()
+            print(f"User: {prompt}")
+            print()
+            print(f"Agent: {response.get('agent_used', 'unknown')}")
+            print()
+            print(response.get('message', 'No response'))
+            print()
         
         # Session summary
         print("=" * 70)
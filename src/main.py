@@ -10,27 +10,147 @@ This agent demonstrates:
 """
 
 import os
+import asyncio
+import atexit
+import hashlib
 import logging
-from datetime import datetime
-from typing import Dict, List
+import logging.handlers
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 import google.generativeai as genai
 from agents.study_planner import StudyPlannerAgent
 from agents.question_answerer import QuestionAnswererAgent
 from agents.progress_tracker import ProgressTrackerAgent
 from agents.coordinator import CoordinatorAgent
+from agents.context_cache import create_cached_model
+from agents.session import new_session
+from agents.streaming import generate_text
 from tools.study_tools import create_study_schedule, save_progress, get_study_tips
 
-# Configure logging for observability
+try:
+    import numpy as np
+except ImportError:  # optional dependency for the semantic response cache
+    np = None
+
+try:
+    import faiss
+    faiss.omp_set_num_threads(os.cpu_count() or 1)
+except ImportError:  # optional: SIMD similarity search for the semantic cache
+    faiss = None
+
+# Configure logging for observability. The level defaults to WARNING so
+# per-request INFO records are skipped unless STUDY_LOG_LEVEL asks for them.
+# Request threads only put records on a queue; a background listener writes
+# them to the log file (opened on the first write) and, if STUDY_LOG_TTY is
+# set, to the console.
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [logging.FileHandler('study_assistant.log', delay=True)]
+if os.environ.get('STUDY_LOG_TTY'):
+    _log_handlers.append(logging.StreamHandler())
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue: queue.Queue = queue.Queue()
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)  # writes out the records still queued
+
 logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('study_assistant.log'),
-        logging.StreamHandler()
-    ]
+    level=os.environ.get('STUDY_LOG_LEVEL', 'WARNING').upper(),
+    format='%(message)s',  # the listener's handlers apply the full format
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
 logger = logging.getLogger(__name__)
 
+# Gemini model shared by all agents
+_MODEL_NAME = 'gemini-2.0-flash-exp'
+
+# Warmup request sent in the background when the shared model is created
+_WARMUP_GENERATION_CONFIG = {'max_output_tokens': 1}
+
+# Maximum number of responses kept for repeated requests
+_EXACT_CACHE_SIZE = 512
+
+# Agents whose responses can be replayed; the progress tracker is left out
+# because every update has to be recorded in session memory
+_CACHEABLE_AGENTS = frozenset({'study_planner', 'question_answerer'})
+
+# Agents whose responses can also be replayed for paraphrases. Plans are
+# left out: embeddings barely register numbers, so "exam in 2 weeks" and
+# "exam in 5 weeks" would share a plan
+_SEMANTIC_AGENTS = frozenset({'question_answerer'})
+
+# Semantic cache: paraphrased requests whose embeddings are at least
+# _SEMANTIC_THRESHOLD cosine-similar reuse the earlier response
+_SEMANTIC_MODEL = 'all-MiniLM-L6-v2'
+_SEMANTIC_DIM = 384
+_SEMANTIC_THRESHOLD = 0.87
+_SEMANTIC_CACHE_SIZE = 1024
+
+# With faiss, once this many embeddings are cached they train an 8-bit
+# scalar quantizer index that replaces the float32 one. Only the latest
+# embeddings stay in float32 to re-score their matches exactly; older
+# matches are scored on the int8 codes, which stay within about 0.002 of
+# the exact cosine, so the int8 search radius is kept slightly wider
+_SEMANTIC_TRAIN_SIZE = 256
+_SEMANTIC_RECENT_SIZE = 64
+_SEMANTIC_SEARCH_MARGIN = 0.01
+
+# Worker threads for specialist calls started ahead of the coordinator
+_SPECULATION_WORKERS = 4
+
+# Maximum worker threads used by process_batch
+_BATCH_WORKERS = 16
+
+
+@lru_cache(maxsize=1)
+def _get_model(api_key: str):
+    """
+    Configure Gemini and create the model, once per process for a given key.
+    
+    The new model is warmed up in the background, so the first request
+    doesn't wait for the connection to be set up.
+    """
+    genai.configure(api_key=api_key)
+    model = genai.GenerativeModel(_MODEL_NAME)
+    threading.Thread(target=_warm_up, args=(model,), name='gemini-warmup', daemon=True).start()
+    return model
+
+
+def _warm_up(model) -> None:
+    """Send a one-token request so the HTTP connection is already set up."""
+    try:
+        model.generate_content("ping", generation_config=_WARMUP_GENERATION_CONFIG)
+    except Exception as e:
+        logger.debug("Gemini warmup request failed: %s", e)
+
+
+@lru_cache(maxsize=None)
+def _get_cached_model(api_key: str, system_instruction: str):
+    """
+    Put a static instruction block in Gemini's context cache, once per process.
+    
+    Keyed by the instruction text, so agents and assistants sharing an
+    instruction share one cached content entry. The returned model renews
+    that entry before its TTL runs out, so it can be kept for the life of
+    the process. A failed attempt is remembered too, and later agents fall
+    back to full prompts right away.
+    
+    Args:
+        api_key: Gemini API key the cached content belongs to
+        system_instruction: Static instruction block to cache
+        
+    Returns:
+        A model bound to the cached instruction, or None if caching is unavailable
+    """
+    _get_model(api_key)  # configures Gemini for this key
+    return create_cached_model(_MODEL_NAME, system_instruction)
+
 
 class SmartStudyAssistant:
     """
@@ -43,6 +163,14 @@ class SmartStudyAssistant:
     - Coordinator Agent: Routes requests to appropriate agents
     """
     
+    __slots__ = (
+        'model', 'session_memory',
+        'study_planner', 'question_answerer', 'progress_tracker', 'coordinator',
+        '_specialists', '_dispatch', '_async_dispatch', '_speculative_agents', '_pool',
+        '_exact_cache', '_semantic_enabled', '_embedder',
+        '_sem_index', '_sem_quantized', '_sem_recent', '_sem_vecs', '_sem_resps', '_sem_lru'
+    )
+    
     def __init__(self, api_key: str):
         """
         Initialize the Smart Study Assistant.
@@ -52,24 +180,69 @@ class SmartStudyAssistant:
         """
         logger.info("Initializing Smart Study Assistant")
         
-        # Configure Gemini API
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        # Configure Gemini API (one shared model per API key, warmed up once)
+        self.model = _get_model(api_key)
         
-        # Initialize session memory (in-memory state management)
-        self.session_memory = {
-            'user_profile': {},
-            'study_plans': [],
-            'progress_history': [],
-            'conversation_history': []
-        }
+        # Initialize session memory (in-memory state management, bounded
+        # so long-running sessions don't grow without limit)
+        self.session_memory = new_session()
         
-        # Initialize specialized agents
-        self.study_planner = StudyPlannerAgent(self.model)
-        self.question_answerer = QuestionAnswererAgent(self.model)
-        self.progress_tracker = ProgressTrackerAgent(self.model)
+        # Initialize specialized agents (specialists can keep their static
+        # instructions in Gemini's context cache when GEMINI_CONTEXT_CACHE=1;
+        # the coordinator's classifier prompt is too short to be cached)
+        use_context_cache = os.getenv('GEMINI_CONTEXT_CACHE') == '1'
+        self.study_planner = self._create_specialist(StudyPlannerAgent, api_key, use_context_cache)
+        self.question_answerer = self._create_specialist(QuestionAnswererAgent, api_key, use_context_cache)
+        self.progress_tracker = self._create_specialist(ProgressTrackerAgent, api_key, use_context_cache)
         self.coordinator = CoordinatorAgent(self.model)
         
+        # Specialist agents by name, as returned by the coordinator
+        self._specialists = {
+            'study_planner': self.study_planner,
+            'question_answerer': self.question_answerer,
+            'progress_tracker': self.progress_tracker
+        }
+        
+        # Dispatch tables: agent name -> call into that specialist
+        self._dispatch = {
+            'study_planner': lambda u: self.study_planner.create_plan(u, self.session_memory),
+            'question_answerer': lambda u: self.question_answerer.answer_question(u, self.session_memory),
+            'progress_tracker': lambda u: self.progress_tracker.track_progress(u, self.session_memory),
+        }
+        self._async_dispatch = {
+            'study_planner': lambda u: self.study_planner.create_plan_async(u, self.session_memory),
+            'question_answerer': lambda u: self.question_answerer.answer_question_async(u, self.session_memory),
+            'progress_tracker': lambda u: self.progress_tracker.track_progress_async(u, self.session_memory),
+        }
+        
+        # Specialists whose LLM call can start before the route is confirmed.
+        # Their prompts only read session memory, and the memory update
+        # happens in handle_response afterwards. The progress tracker
+        # records the update before building its prompt, so it is left out.
+        self._speculative_agents = {
+            'study_planner': self.study_planner,
+            'question_answerer': self.question_answerer
+        }
+        self._pool = ThreadPoolExecutor(max_workers=_SPECULATION_WORKERS)
+        
+        # LRU cache of responses to repeated requests, keyed by _cache_key
+        self._exact_cache: OrderedDict[str, Dict] = OrderedDict()
+        
+        # Semantic cache of paraphrased requests (needs numpy and
+        # sentence-transformers, which is imported and loaded on first use).
+        # Slot i embeds the request answered by _sem_resps[i]; embeddings are
+        # kept in a FAISS index under id i when faiss is installed (float32,
+        # then int8 once trained, with the latest ones also in _sem_recent),
+        # otherwise in row i of _sem_vecs.
+        self._semantic_enabled = np is not None
+        self._embedder = None
+        self._sem_index = None
+        self._sem_quantized = False
+        self._sem_recent: OrderedDict[int, object] = OrderedDict()  # slot -> float32 embedding
+        self._sem_vecs = None
+        self._sem_resps: List[Tuple[str, Dict]] = []  # (user_id, response)
+        self._sem_lru: deque = deque()  # row indices, least recently used first
+        
         logger.info("Smart Study Assistant initialized successfully")
     
     def process_request(self, user_input: str, user_id: str = "default_user") -> Dict:
@@ -88,61 +261,487 @@ class SmartStudyAssistant:
         Returns:
             Dictionary containing the response and metadata
         """
-        logger.info(f"Processing request from user {user_id}: {user_input[:50]}...")
+        logger.info("Processing request from user %s: %.50s...", user_id, user_input)
+        started_ns = self._start_turn()
         
-        # Add to conversation history (memory)
-        self.session_memory['conversation_history'].append({
-            'timestamp': datetime.now().isoformat(),
-            'user_id': user_id,
-            'input': user_input
-        })
+        # Repeated and paraphrased requests skip both the coordinator and the specialist
+        cache_key, embedding, cached = self._check_caches(user_input, user_id)
+        if cached is not None:
+            return self._replay_cached(cached, user_input, user_id, started_ns)
         
         try:
+            # Start the likely specialist's LLM call while the coordinator decides
+            guess, speculation = self._speculate(user_input)
+            
             # Step 1: Coordinator agent determines which specialist to use
             logger.info("Coordinator agent analyzing request...")
-            agent_type = self.coordinator.route_request(user_input)
-            logger.info(f"Request routed to: {agent_type}")
+            agent_type = self.coordinator.classify(user_input, self.session_memory.get('last_agent'))
+            logger.info("Request routed to: %s", agent_type)
             
             # Step 2: Execute appropriate specialist agent (Sequential workflow)
-            if agent_type == "study_planner":
-                response = self.study_planner.create_plan(
-                    user_input, 
-                    self.session_memory
-                )
-            elif agent_type == "question_answerer":
-                response = self.question_answerer.answer_question(
-                    user_input,
-                    self.session_memory
-                )
-            elif agent_type == "progress_tracker":
-                response = self.progress_tracker.track_progress(
-                    user_input,
-                    self.session_memory
-                )
+            response = None
+            if speculation is not None:
+                if agent_type == guess:
+                    response = self._finish_speculation(agent_type, speculation, user_input)
+                else:
+                    logger.info("Discarding speculative %s call", guess)
+                    speculation.cancel()
+            if response is None:
+                response = self._run_specialist(agent_type, user_input)
+            
+            self._finish_turn(agent_type, response, user_input, user_id, cache_key, embedding, started_ns)
+            logger.info("Request processed successfully by %s", agent_type)
+            return response
+            
+        except Exception as e:
+            return self._error_response(e, user_input, user_id, started_ns)
+    
+    def process_batch(self, inputs: List[str], user_id: str = "default_user") -> List[Dict]:
+        """
+        Process several requests with their LLM calls running in parallel.
+        
+        All coordinator classifications are started at once, and each
+        request's specialist call starts as soon as its route is known.
+        Only the Gemini calls run on worker threads; prompts are built and
+        session memory is updated on the calling thread. Requests in a
+        batch don't see each other's answers in their prompts.
+        
+        Progress updates are recorded in the order their routes arrive and
+        specialist responses in input order. Each turn is added to
+        conversation history once it is settled (cache hits first, repeats
+        of an earlier request last), so history order can differ from the
+        inputs; the entries' timestamp_ns values follow input order.
+        
+        Args:
+            inputs: The user's requests
+            user_id: Unique identifier for the user session
+            
+        Returns:
+            List of responses in the same order as the inputs
+        """
+        responses: List[Optional[Dict]] = [None] * len(inputs)
+        started_ns = [0] * len(inputs)
+        pending = []      # (index, cache key, embedding) of requests for the LLM
+        first_index = {}  # cache key -> index of the first pending request with it
+        duplicates = []   # (index, index of the identical pending request, cache key, embedding)
+        
+        for i, user_input in enumerate(inputs):
+            logger.info("Processing request from user %s: %.50s...", user_id, user_input)
+            started_ns[i] = self._start_turn()
+            cache_key, embedding, cached = self._check_caches(user_input, user_id)
+            if cached is not None:
+                responses[i] = self._replay_cached(cached, user_input, user_id, started_ns[i])
+            elif cache_key in first_index:
+                duplicates.append((i, first_index[cache_key], cache_key, embedding))
             else:
-                response = {
-                    'status': 'error',
-                    'message': 'Unable to process request',
-                    'agent_used': 'none'
+                first_index[cache_key] = i
+                pending.append((i, cache_key, embedding))
+        
+        routes = {}
+        if pending:
+            last_agent = self.session_memory.get('last_agent')
+            with ThreadPoolExecutor(max_workers=min(_BATCH_WORKERS, len(pending))) as pool:
+                # Wave 1: every classification at once
+                route_futures = {
+                    pool.submit(self.coordinator.classify, inputs[i], last_agent): (i, cache_key, embedding)
+                    for i, cache_key, embedding in pending
                 }
+                
+                # Wave 2: each specialist call as soon as its route is known
+                calls = []
+                for route_future in as_completed(route_futures):
+                    i, cache_key, embedding = route_futures[route_future]
+                    try:
+                        agent_type = route_future.result()
+                        agent = self._specialists[agent_type]
+                        if agent_type == 'progress_tracker':
+                            agent.record_progress(inputs[i], self.session_memory)
+                        prompt = agent.build_prompt(inputs[i], self.session_memory)
+                    except Exception as e:
+                        responses[i] = self._error_response(e, inputs[i], user_id, started_ns[i])
+                        continue
+                    routes[i] = agent_type
+                    calls.append((i, agent_type, cache_key, embedding,
+                                  pool.submit(generate_text, agent.model, prompt)))
+                
+                calls.sort(key=lambda call: call[0])  # responses are handled in input order
+                for i, agent_type, cache_key, embedding, call in calls:
+                    try:
+                        response = self._specialists[agent_type].handle_response(
+                            inputs[i], call.result(), self.session_memory
+                        )
+                    except Exception as e:
+                        responses[i] = self._error_response(e, inputs[i], user_id, started_ns[i])
+                        continue
+                    self._finish_turn(agent_type, response, inputs[i], user_id,
+                                      cache_key, embedding, started_ns[i])
+                    responses[i] = response
+        
+        # Identical requests reuse the first answer when it was cacheable
+        for i, original, cache_key, embedding in duplicates:
+            agent_type = routes.get(original)
+            cached = responses[original]
+            if agent_type in _CACHEABLE_AGENTS and cached.get('status') == 'success':
+                responses[i] = self._replay_cached({**cached, 'cache': 'exact'}, inputs[i], user_id, started_ns[i])
+            elif agent_type is not None:
+                response = self._run_specialist(agent_type, inputs[i])
+                self._finish_turn(agent_type, response, inputs[i], user_id, cache_key, embedding, started_ns[i])
+                responses[i] = response
+            else:
+                responses[i] = cached
+                self._record_turn(started_ns[i], user_id, inputs[i], 'none', cached)
+        
+        return responses
+    
+    async def process_request_async(self, user_input: str, user_id: str = "default_user") -> Dict:
+        """
+        Async variant of process_request that awaits the Gemini async API.
+        
+        Independent requests can be overlapped with asyncio.gather; see
+        process_batch_async.
+        
+        Args:
+            user_input: The user's request or question
+            user_id: Unique identifier for the user session
+            
+        Returns:
+            Dictionary containing the response and metadata
+        """
+        logger.info("Processing request from user %s: %.50s...", user_id, user_input)
+        started_ns = self._start_turn()
+        
+        cache_key, embedding, cached = self._check_caches(user_input, user_id)
+        if cached is not None:
+            return self._replay_cached(cached, user_input, user_id, started_ns)
+        
+        try:
+            logger.info("Coordinator agent analyzing request...")
+            agent_type = await self.coordinator.classify_async(user_input, self.session_memory.get('last_agent'))
+            logger.info("Request routed to: %s", agent_type)
             
-            # Add response to conversation history
-            self.session_memory['conversation_history'].append({
-                'timestamp': datetime.now().isoformat(),
-                'agent': agent_type,
-                'response': response
-            })
+            response = await self._run_specialist_async(agent_type, user_input)
             
-            logger.info(f"Request processed successfully by {agent_type}")
+            self._finish_turn(agent_type, response, user_input, user_id, cache_key, embedding, started_ns)
+            logger.info("Request processed successfully by %s", agent_type)
             return response
             
         except Exception as e:
-            logger.error(f"Error processing request: {str(e)}", exc_info=True)
-            return {
-                'status': 'error',
-                'message': f'An error occurred: {str(e)}',
-                'agent_used': 'none'
-            }
+            return self._error_response(e, user_input, user_id, started_ns)
+    
+    async def process_batch_async(self, inputs: List[str], user_id: str = "default_user") -> List[Dict]:
+        """
+        Process several independent requests concurrently on the event loop.
+        
+        Args:
+            inputs: The user's requests
+            user_id: Unique identifier for the user session
+            
+        Returns:
+            List of responses in the same order as the inputs
+        """
+        return list(await asyncio.gather(
+            *(self.process_request_async(user_input, user_id) for user_input in inputs)
+        ))
+    
+    def _create_specialist(self, agent_class, api_key: str, use_context_cache: bool):
+        """Create a specialist agent, on a context-cached model if possible."""
+        if use_context_cache:
+            cached_model = _get_cached_model(api_key, agent_class.SYSTEM_INSTRUCTION)
+            if cached_model is not None:
+                return agent_class(cached_model, instructions_cached=True)
+        return agent_class(self.model)
+    
+    def _start_turn(self) -> int:
+        """
+        Count a new turn.
+        
+        Returns:
+            The turn's timestamp (time.time_ns()), stored with its history entry
+        """
+        self.session_memory['turn_count'] += 1
+        return time.time_ns()
+    
+    def _record_turn(self, started_ns: int, user_id: str, user_input: str,
+                     agent_type: str, response: Dict) -> None:
+        """Add a request and its response to conversation history (memory) as one entry."""
+        self.session_memory['conversation_history'].append({
+            'timestamp_ns': started_ns,
+            'user_id': user_id,
+            'input': user_input,
+            'agent': agent_type,
+            'response': response
+        })
+    
+    def _check_caches(self, user_input: str, user_id: str) -> Tuple[str, Optional[object], Optional[Dict]]:
+        """
+        Look a request up in the exact and semantic response caches.
+        
+        Progress updates skip both caches: they must reach the progress
+        tracker so that every update is recorded in session memory.
+        Requests that look like they are for another agent outside
+        _SEMANTIC_AGENTS only use the exact cache.
+        
+        Args:
+            user_input: The user's request
+            user_id: Unique identifier for the user session
+            
+        Returns:
+            Tuple of (exact cache key, embedding or None, cached response
+            marked with its cache tier or None on a miss)
+        """
+        cache_key = self._cache_key(user_input, user_id)
+        guess = self.coordinator.guess(user_input)
+        if guess == 'progress_tracker':
+            return cache_key, None, None
+        
+        cached = self._exact_cache.get(cache_key)
+        if cached is not None:
+            self._exact_cache.move_to_end(cache_key)
+            logger.info("Request answered from response cache")
+            return cache_key, None, {**cached, 'cache': 'exact'}
+        
+        if guess is not None and guess not in _SEMANTIC_AGENTS:
+            return cache_key, None, None
+        
+        embedding = self._embed(user_input)
+        if embedding is not None:
+            hit = self._semantic_lookup(embedding, user_id)
+            if hit is not None:
+                cached, similarity = hit
+                logger.info("Request answered from semantic cache (similarity %.3f)", similarity)
+                return cache_key, embedding, {**cached, 'cache': 'semantic', 'similarity': similarity}
+        
+        return cache_key, embedding, None
+    
+    def _finish_turn(self, agent_type: str, response: Dict, user_input: str, user_id: str,
+                     cache_key: str, embedding, started_ns: int) -> None:
+        """Record a specialist's response in session memory and the response caches."""
+        # Remember the route so follow-ups can reuse it
+        if response.get('status') == 'success':
+            self.session_memory['last_agent'] = agent_type
+            if agent_type in _CACHEABLE_AGENTS:
+                self._exact_cache[cache_key] = response
+                if len(self._exact_cache) > _EXACT_CACHE_SIZE:
+                    self._exact_cache.popitem(last=False)
+                if embedding is not None and agent_type in _SEMANTIC_AGENTS:
+                    self._semantic_store(embedding, user_id, response)
+        
+        self._record_turn(started_ns, user_id, user_input, agent_type, response)
+    
+    def _error_response(self, error: Exception, user_input: str, user_id: str, started_ns: int) -> Dict:
+        """Log a processing failure and record its error response as the turn's answer."""
+        logger.error("Error processing request: %s", error, exc_info=True)
+        response = {
+            'status': 'error',
+            'message': f'An error occurred: {str(error)}',
+            'agent_used': 'none'
+        }
+        self._record_turn(started_ns, user_id, user_input, 'none', response)
+        return response
+    
+    def _run_specialist(self, agent_type: str, user_input: str) -> Dict:
+        """Run the routed specialist agent on a request."""
+        handler = self._dispatch.get(agent_type)
+        if handler is None:
+            return self._unroutable_response()
+        return handler(user_input)
+    
+    async def _run_specialist_async(self, agent_type: str, user_input: str) -> Dict:
+        """Async variant of _run_specialist."""
+        handler = self._async_dispatch.get(agent_type)
+        if handler is None:
+            return self._unroutable_response()
+        return await handler(user_input)
+    
+    def _unroutable_response(self) -> Dict:
+        """Build the response for a route with no matching specialist."""
+        return {
+            'status': 'error',
+            'message': 'Unable to process request',
+            'agent_used': 'none'
+        }
+    
+    def _speculate(self, user_input: str) -> Tuple[Optional[str], Optional[Future]]:
+        """
+        Start the LLM call of the specialist the request most likely needs.
+        
+        The prompt is built here so only the network call runs on the pool.
+        
+        Args:
+            user_input: The user's request
+            
+        Returns:
+            Tuple of (guessed agent, future generating its response text),
+            or (None, None) if there is no speculative candidate
+        """
+        guess = self.coordinator.guess(user_input)
+        agent = self._speculative_agents.get(guess)
+        if agent is None:
+            return None, None
+        
+        prompt = agent.build_prompt(user_input, self.session_memory)
+        return guess, self._pool.submit(generate_text, agent.model, prompt)
+    
+    def _finish_speculation(self, agent_type: str, speculation: Future, user_input: str) -> Optional[Dict]:
+        """
+        Turn a confirmed speculative call into the specialist's response.
+        
+        Args:
+            agent_type: Agent the coordinator routed to (and that was guessed)
+            speculation: Future returned by _speculate
+            user_input: The user's request
+            
+        Returns:
+            The specialist's response, or None if the speculative call failed
+            and the specialist should be asked again
+        """
+        try:
+            text = speculation.result()
+        except Exception as e:
+            logger.warning("Speculative %s call failed, retrying: %s", agent_type, e)
+            return None
+        
+        return self._speculative_agents[agent_type].handle_response(user_input, text, self.session_memory)
+    
+    def _cache_key(self, user_input: str, user_id: str) -> str:
+        """Build the response cache key for a user's request, ignoring case and spacing."""
+        normalized = " ".join(user_input.strip().lower().split())
+        return hashlib.sha256(f"{user_id}\0{normalized}".encode()).hexdigest()
+    
+    def _replay_cached(self, response: Dict, user_input: str, user_id: str, started_ns: int) -> Dict:
+        """Record a cached response in session memory as this turn's answer."""
+        self.session_memory['last_agent'] = response['agent_used']
+        self._record_turn(started_ns, user_id, user_input, response['agent_used'], response)
+        return response
+    
+    def _embed(self, text: str):
+        """
+        Embed a request for the semantic cache.
+        
+        Args:
+            text: The user's request
+            
+        Returns:
+            L2-normalized float32 vector, or None if the semantic cache is unavailable
+        """
+        if not self._semantic_enabled:
+            return None
+        
+        if self._embedder is None:
+            try:
+                # Imported here because it loads torch, which takes seconds
+                from sentence_transformers import SentenceTransformer
+                self._embedder = SentenceTransformer(_SEMANTIC_MODEL)
+            except Exception as e:
+                logger.warning("Semantic cache disabled, could not load %s: %s", _SEMANTIC_MODEL, e)
+                self._semantic_enabled = False
+                return None
+            if faiss is not None:
+                # Inner product of normalized vectors is their cosine similarity
+                self._sem_index = faiss.IndexIDMap2(faiss.IndexFlatIP(_SEMANTIC_DIM))
+            else:
+                self._sem_vecs = np.zeros((_SEMANTIC_CACHE_SIZE, _SEMANTIC_DIM), dtype=np.float32)
+        
+        try:
+            return self._embedder.encode(text, normalize_embeddings=True).astype(np.float32)
+        except Exception as e:
+            # Requests must still be answered, just without the semantic tier
+            logger.warning("Semantic cache disabled, embedding failed: %s", e)
+            self._semantic_enabled = False
+            return None
+    
+    def _semantic_lookup(self, embedding, user_id: str,
+                         tau: float = _SEMANTIC_THRESHOLD) -> Optional[Tuple[Dict, float]]:
+        """
+        Find the cached response for the user's most similar earlier request.
+        
+        Args:
+            embedding: Normalized embedding of the request
+            user_id: Only responses given to this user are considered
+            tau: Minimum cosine similarity for a hit
+            
+        Returns:
+            Tuple of (cached response, similarity), or None on a miss
+        """
+        count = len(self._sem_resps)
+        if count == 0:
+            return None
+        
+        # Every entry above the threshold, so a closer match cached for
+        # another user doesn't hide this user's own
+        if self._sem_quantized:
+            radius = tau - _SEMANTIC_SEARCH_MARGIN
+            _, sims, ids = self._sem_index.range_search(embedding.reshape(1, -1), radius)
+            # Re-score with the exact cosine where the float32 embedding is still kept
+            sims = np.array([
+                float(self._sem_recent[i] @ embedding) if i in self._sem_recent else sim
+                for i, sim in zip(ids.tolist(), sims.tolist())
+            ], dtype=np.float32)
+            above = sims >= tau
+            ids, sims = ids[above], sims[above]
+        elif self._sem_index is not None:
+            _, sims, ids = self._sem_index.range_search(embedding.reshape(1, -1), tau)
+        else:
+            sims = self._sem_vecs[:count] @ embedding
+            ids = np.flatnonzero(sims >= tau)
+            sims = sims[ids]
+        
+        for j in np.argsort(-sims):
+            i = int(ids[j])
+            owner, response = self._sem_resps[i]
+            if owner == user_id:
+                similarity = float(sims[j])
+                break
+        else:
+            return None
+        
+        self._sem_lru.remove(i)
+        self._sem_lru.append(i)
+        return response, similarity
+    
+    def _semantic_store(self, embedding, user_id: str, response: Dict) -> None:
+        """Add a response to the semantic cache, reusing the least recently used row when full."""
+        if len(self._sem_resps) < _SEMANTIC_CACHE_SIZE:
+            i = len(self._sem_resps)
+            self._sem_resps.append((user_id, response))
+            evicted = False
+        else:
+            i = self._sem_lru.popleft()
+            self._sem_resps[i] = (user_id, response)
+            evicted = True
+        
+        if self._sem_index is not None:
+            ids = np.array([i], dtype=np.int64)
+            if evicted:
+                self._sem_index.remove_ids(ids)
+            self._sem_index.add_with_ids(embedding.reshape(1, -1), ids)
+            self._sem_recent[i] = embedding
+            self._sem_recent.move_to_end(i)
+            if len(self._sem_recent) > _SEMANTIC_RECENT_SIZE:
+                self._sem_recent.popitem(last=False)
+        else:
+            self._sem_vecs[i] = embedding
+        self._sem_lru.append(i)
+        
+        if (self._sem_index is not None and not self._sem_quantized
+                and len(self._sem_resps) >= _SEMANTIC_TRAIN_SIZE):
+            self._quantize_semantic_index()
+    
+    def _quantize_semantic_index(self) -> None:
+        """Replace the float32 FAISS index with an int8 one trained on the cached embeddings."""
+        ids = np.arange(len(self._sem_resps), dtype=np.int64)
+        vecs = self._sem_index.reconstruct_batch(ids)
+        
+        # One value range for all dimensions: per-dimension ranges trained on
+        # a few hundred vectors would clip dimensions the sample barely covered
+        index = faiss.IndexIDMap2(faiss.IndexScalarQuantizer(
+            _SEMANTIC_DIM, faiss.ScalarQuantizer.QT_8bit_uniform, faiss.METRIC_INNER_PRODUCT
+        ))
+        index.train(vecs)
+        index.add_with_ids(vecs, ids)
+        self._sem_index = index
+        self._sem_quantized = True
+        logger.info("Semantic cache switched to an int8 index with %s entries", len(ids))
     
     def get_session_summary(self) -> Dict:
         """
@@ -154,8 +753,8 @@ class SmartStudyAssistant:
             Dictionary containing session statistics
         """
         return {
-            'total_interactions': len(self.session_memory['conversation_history']),
-            'study_plans_created': len(self.session_memory['study_plans']),
+            'total_interactions': self.session_memory['turn_count'],
+            'study_plans_created': self.session_memory['plan_count'],
             'progress_entries': len(self.session_memory['progress_history']),
             'user_profile': self.session_memory['user_profile']
         }
@@ -189,30 +788,26 @@ def main():
         return
     
     # Example interactions
-    print("📝 Example 1: Creating a Study Plan")
-    print("-" * 60)
-    response1 = assistant.process_request(
-        "I need to prepare for my Python programming exam in 2 weeks. "
-        "I'm a beginner and can study 2 hours per day."
-    )
-    print(f"Response: {response1.get('message', 'No response')[:200]}...")
-    print()
+    examples = [
+        ("📝 Example 1: Creating a Study Plan",
+         "I need to prepare for my Python programming exam in 2 weeks. "
+         "I'm a beginner and can study 2 hours per day."),
+        ("❓ Example 2: Asking a Question",
+         "What is the difference between a list and a tuple in Python?"),
+        ("📊 Example 3: Tracking Progress",
+         "I completed studying variables and data types today. It took 1.5 hours."),
+    ]
     
-    print("❓ Example 2: Asking a Question")
-    print("-" * 60)
-    response2 = assistant.process_request(
-        "What is the difference between a list and a tuple in Python?"
-    )
-    print(f"Response: {response2.get('message', 'No response')[:200]}...")
-    print()
+    # The plan is created first so the later examples see it in session
+    # memory; those two are independent, so their LLM calls are overlapped
+    responses = [assistant.process_request(examples[0][1])]
+    responses += asyncio.run(assistant.process_batch_async([prompt for _, prompt in examples[1:]]))
     
-    print("📊 Example 3: Tracking Progress")
-    print("-" * 60)
-    response3 = assistant.process_request(
-        "I completed studying variables and data types today. It took 1.5 hours."
-    )
-    print(f"Response: {response3.get('message', 'No response')[:200]}...")
-    print()
+    for (title, _), response in zip(examples, responses):
+        print(title)
+        print("-" * 60)
+        print(f"Response: {response.get('message', 'No response')[:200]}...")
+        print()
     
     # Show session summary
     print("📈 Session Summary")
@@ -225,6 +820,7 @@ def main():
     
     print("✅ Demo completed successfully!")
     print("Check 'study_assistant.log' for detailed logs (Observability)")
+    print("Set STUDY_LOG_LEVEL=INFO to log every request")
 
 
 if __name__ == "__main__":
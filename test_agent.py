@@ -5,6 +5,7 @@ This demonstrates how to use the agent system with example interactions.
 Run this file to test the agent without needing a real API key initially.
 """
 
+import asyncio
 import os
 from src.main import SmartStudyAssistant
 
@@ -76,38 +77,27 @@ def test_with_real_api():
         print("✅ Assistant initialized successfully!")
         print()
         
-        # Test 1: Study Planning
-        print("📝 Test 1: Study Planning")
-        print("-" * 70)
-        response1 = assistant.process_request(
-            "I need to prepare for a Python exam in 2 weeks. I can study 2 hours daily."
-        )
-        print(f"Status: {response1.get('status')}")
-        print(f"Agent used: {response1.get('agent_used')}")
-        print(f"Response preview: {response1.get('message', '')[:150]}...")
-        print()
+        tests = [
+            ("📝 Test 1: Study Planning",
+             "I need to prepare for a Python exam in 2 weeks. I can study 2 hours daily."),
+            ("❓ Test 2: Question Answering",
+             "What is the difference between a list and a tuple in Python?"),
+            ("📊 Test 3: Progress Tracking",
+             "I completed studying Python variables today. It took 1.5 hours."),
+        ]
         
-        # Test 2: Question Answering
-        print("❓ Test 2: Question Answering")
-        print("-" * 70)
-        response2 = assistant.process_request(
-            "What is the difference between a list and a tuple in Python?"
-        )
-        print(f"Status: {response2.get('status')}")
-        print(f"Agent used: {response2.get('agent_used')}")
-        print(f"Response preview: {response2.get('message', '')[:150]}...")
-        print()
+        # The plan is created first so the later tests see it in session
+        # memory; those two are independent, so their requests are overlapped
+        responses = [assistant.process_request(tests[0][1])]
+        responses += asyncio.run(assistant.process_batch_async([prompt for _, prompt in tests[1:]]))
         
-        # Test 3: Progress Tracking
-        print("📊 Test 3: Progress Tracking")
-        print("-" * 70)
-        response3 = assistant.process_request(
-            "I completed studying Python variables today. It took 1.5 hours."
-        )
-        print(f"Status: {response3.get('status')}")
-        print(f"Agent used: {response3.get('agent_used')}")
-        print(f"Response preview: {response3.get('message', '')[:150]}...")
-        print()
+        for (title, _), response in zip(tests, responses):
+            print(title)
+            print("-" * 70)
+            print(f"Status: {response.get('status')}")
+            print(f"Agent used: {response.get('agent_used')}")
+            print(f"Response preview: {response.get('message', '')[:150]}...")
+            print()
         
         # Show session summary
         print("📈 Session Summary")
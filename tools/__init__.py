@@ -5,6 +5,7 @@ Tools package for Smart Study Assistant.
 from .study_tools import (
     create_study_schedule,
     save_progress,
+    flush_progress,
     get_study_tips,
     calculate_study_statistics,
     generate_quiz_questions
@@ -13,6 +14,7 @@ from .study_tools import (
 __all__ = [
     'create_study_schedule',
     'save_progress',
+    'flush_progress',
     'get_study_tips',
     'calculate_study_statistics',
     'generate_quiz_questions'
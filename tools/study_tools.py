@@ -5,13 +5,79 @@ These are custom tool functions that agents can use to perform specific tasks.
 This demonstrates the "Custom Tools" requirement for the competition.
 """
 
+import atexit
 import json
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List
+import queue
+import sys
+import threading
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, TextIO, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional dependency, falls back to json
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Background progress writer: save_progress queues encoded lines and a
+# single daemon thread appends them through long-lived file handles
+_PROGRESS_FLUSH_EVERY = 32     # entries written between flushes
+_PROGRESS_FLUSH_INTERVAL = 1.0  # seconds idle before flushing
+_progress_lock = threading.Lock()
+_progress_handles: Dict[str, TextIO] = {}
+_progress_queue: "queue.Queue[Tuple[str, str]]" = queue.Queue()
+_progress_writer: Optional[threading.Thread] = None
+
+# Curated study tips by category, used by get_study_tips
+_TIPS_DB: Dict[str, Tuple[str, ...]] = {
+    'time_management': (
+        'Use the Pomodoro Technique: 25 minutes of focused study, 5-minute break',
+        'Create a daily schedule and stick to it',
+        'Prioritize difficult subjects when your energy is highest',
+        'Break large tasks into smaller, manageable chunks',
+        'Set specific, achievable goals for each study session'
+    ),
+    'memory': (
+        'Use spaced repetition to reinforce learning',
+        'Create mnemonics and memory aids',
+        'Teach concepts to others to solidify understanding',
+        'Use active recall instead of passive reading',
+        'Connect new information to what you already know'
+    ),
+    'focus': (
+        'Eliminate distractions (phone, social media)',
+        'Create a dedicated study space',
+        'Use background music or white noise if helpful',
+        'Take regular breaks to maintain concentration',
+        'Stay hydrated and maintain good posture'
+    ),
+    'exam_prep': (
+        'Start preparing well in advance, not last minute',
+        'Practice with past papers and sample questions',
+        'Identify and focus on weak areas',
+        'Get adequate sleep before the exam',
+        'Review key concepts the morning of the exam'
+    ),
+    'motivation': (
+        'Set clear, meaningful goals',
+        'Reward yourself for achieving milestones',
+        'Study with peers for accountability',
+        'Track your progress visually',
+        'Remember your long-term objectives'
+    )
+}
+
+_DEFAULT_TIPS = (
+    'Stay consistent with your study routine',
+    'Ask for help when you need it',
+    'Believe in your ability to learn and improve'
+)
+
+_NS_PER_DAY = 86_400 * 10**9
+
 
 def create_study_schedule(subject: str, days: int, hours_per_day: float) -> Dict:
     """
@@ -27,31 +93,32 @@ def create_study_schedule(subject: str, days: int, hours_per_day: float) -> Dict
     Returns:
         Dictionary containing the schedule
     """
-    logger.info(f"Creating study schedule for {subject}, {days} days, {hours_per_day} hours/day")
+    logger.info("Creating study schedule for %s, %s days, %s hours/day", subject, days, hours_per_day)
     
     total_hours = days * hours_per_day
     
+    # Generate daily entries, stepping the date by ordinal
+    # (date.isoformat() gives the same YYYY-MM-DD as strftime, faster)
+    start = date.today().toordinal()
+    daily_schedule = [
+        {
+            'day': day,
+            'date': date.fromordinal(start + day - 1).isoformat(),
+            'hours': hours_per_day,
+            'focus': f'Day {day} topics for {subject}'
+        }
+        for day in range(1, days + 1)
+    ]
+    
     # Create daily breakdown
     schedule = {
         'subject': subject,
         'total_days': days,
         'hours_per_day': hours_per_day,
         'total_hours': total_hours,
-        'daily_schedule': []
+        'daily_schedule': daily_schedule
     }
     
-    # Generate daily entries
-    start_date = datetime.now()
-    for day in range(days):
-        current_date = start_date + timedelta(days=day)
-        daily_entry = {
-            'day': day + 1,
-            'date': current_date.strftime('%Y-%m-%d'),
-            'hours': hours_per_day,
-            'focus': f'Day {day + 1} topics for {subject}'
-        }
-        schedule['daily_schedule'].append(daily_entry)
-    
     logger.info("Study schedule created successfully")
     return schedule
 
@@ -60,27 +127,98 @@ def save_progress(progress_data: Dict, filename: str = 'progress.json') -> bool:
     """
     Save progress data to a file.
     
-    This is a custom tool for data persistence.
+    This is a custom tool for data persistence. The entry is encoded here
+    and appended to the file by a background writer thread, so the caller
+    doesn't wait on file I/O; call flush_progress() to wait for the write.
     
     Args:
         progress_data: Dictionary containing progress information
         filename: File to save to
         
     Returns:
-        True if successful, False otherwise
+        True if the entry was queued for writing, False otherwise
     """
     try:
-        with open(filename, 'a') as f:
-            json.dump(progress_data, f)
-            f.write('\n')
-        logger.info(f"Progress saved to {filename}")
-        return True
+        line = _dumps(progress_data) + '\n'
     except Exception as e:
-        logger.error(f"Error saving progress: {e}")
+        logger.error("Error saving progress: %s", e)
         return False
+    
+    _start_progress_writer()
+    _progress_queue.put((filename, line))
+    return True
+
+
+def _dumps(data) -> str:
+    """Encode data as compact JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, separators=(',', ':'))
 
 
-def get_study_tips(category: str) -> List[str]:
+def flush_progress() -> None:
+    """Wait until all queued progress entries are written and flushed to disk."""
+    if _progress_writer is None:
+        return
+    _progress_queue.join()
+    _flush_progress_handles()
+
+
+def _start_progress_writer() -> None:
+    """Start the background progress writer on first use."""
+    global _progress_writer
+    with _progress_lock:
+        if _progress_writer is None:
+            _progress_writer = threading.Thread(
+                target=_write_progress, name='progress-writer', daemon=True
+            )
+            _progress_writer.start()
+            atexit.register(flush_progress)
+
+
+def _write_progress() -> None:
+    """Append queued progress entries, keeping one open handle per file."""
+    unflushed = 0
+    while True:
+        try:
+            filename, line = _progress_queue.get(timeout=_PROGRESS_FLUSH_INTERVAL)
+        except queue.Empty:
+            if unflushed:
+                _flush_progress_handles()
+                unflushed = 0
+            continue
+        
+        try:
+            with _progress_lock:
+                handle = _progress_handles.get(filename)
+                if handle is None:
+                    handle = _progress_handles[filename] = open(filename, 'a', encoding='utf-8')
+                handle.write(line)
+            unflushed += 1
+            logger.info("Progress saved to %s", filename)
+            
+            # Flush once the queue drains or the batch gets large
+            if unflushed >= _PROGRESS_FLUSH_EVERY or _progress_queue.empty():
+                _flush_progress_handles()
+                unflushed = 0
+        except Exception as e:
+            logger.error("Error saving progress: %s", e)
+        finally:
+            _progress_queue.task_done()
+
+
+def _flush_progress_handles() -> None:
+    """Flush every open progress file."""
+    with _progress_lock:
+        for handle in _progress_handles.values():
+            try:
+                handle.flush()
+            except Exception as e:
+                logger.error("Error flushing progress file %s: %s", handle.name, e)
+
+
+@lru_cache(maxsize=32)
+def get_study_tips(category: str) -> Tuple[str, ...]:
     """
     Get study tips for a specific category.
     
@@ -90,64 +228,34 @@ def get_study_tips(category: str) -> List[str]:
         category: Category of study tips (e.g., 'time_management', 'memory', 'focus')
         
     Returns:
-        List of study tips
+        Tuple of study tips (shared between calls, so read-only)
     """
-    tips_database = {
-        'time_management': [
-            'Use the Pomodoro Technique: 25 minutes of focused study, 5-minute break',
-            'Create a daily schedule and stick to it',
-            'Prioritize difficult subjects when your energy is highest',
-            'Break large tasks into smaller, manageable chunks',
-            'Set specific, achievable goals for each study session'
-        ],
-        'memory': [
-            'Use spaced repetition to reinforce learning',
-            'Create mnemonics and memory aids',
-            'Teach concepts to others to solidify understanding',
-            'Use active recall instead of passive reading',
-            'Connect new information to what you already know'
-        ],
-        'focus': [
-            'Eliminate distractions (phone, social media)',
-            'Create a dedicated study space',
-            'Use background music or white noise if helpful',
-            'Take regular breaks to maintain concentration',
-            'Stay hydrated and maintain good posture'
-        ],
-        'exam_prep': [
-            'Start preparing well in advance, not last minute',
-            'Practice with past papers and sample questions',
-            'Identify and focus on weak areas',
-            'Get adequate sleep before the exam',
-            'Review key concepts the morning of the exam'
-        ],
-        'motivation': [
-            'Set clear, meaningful goals',
-            'Reward yourself for achieving milestones',
-            'Study with peers for accountability',
-            'Track your progress visually',
-            'Remember your long-term objectives'
-        ]
-    }
+    tips = _TIPS_DB.get(category.lower(), _DEFAULT_TIPS)
     
-    tips = tips_database.get(category.lower(), [
-        'Stay consistent with your study routine',
-        'Ask for help when you need it',
-        'Believe in your ability to learn and improve'
-    ])
-    
-    logger.info(f"Retrieved {len(tips)} tips for category: {category}")
+    logger.info("Retrieved %s tips for category: %s", len(tips), category)
     return tips
 
 
-def calculate_study_statistics(progress_history: List[Dict]) -> Dict:
+def _timestamp_ns(entry) -> int:
+    """Read a progress entry's time as epoch nanoseconds."""
+    if isinstance(entry, dict):
+        if 'timestamp_ns' in entry:
+            return entry['timestamp_ns']
+        # Older entries store an ISO timestamp string
+        return int(datetime.fromisoformat(entry['timestamp']).timestamp() * 1e9)
+    return entry.timestamp_ns
+
+
+def calculate_study_statistics(progress_history: Sequence) -> Dict:
     """
     Calculate statistics from progress history.
     
     This is a custom tool for data analysis.
     
     Args:
-        progress_history: List of progress entries
+        progress_history: Progress entries in time order, either
+            ProgressEntry objects or dicts with 'timestamp_ns' (or an
+            ISO 'timestamp')
         
     Returns:
         Dictionary containing calculated statistics
@@ -163,9 +271,8 @@ def calculate_study_statistics(progress_history: List[Dict]) -> Dict:
     
     # Calculate time span
     if len(progress_history) > 1:
-        first_date = datetime.fromisoformat(progress_history[0]['timestamp'])
-        last_date = datetime.fromisoformat(progress_history[-1]['timestamp'])
-        days_span = (last_date - first_date).days + 1
+        span_ns = _timestamp_ns(progress_history[-1]) - _timestamp_ns(progress_history[0])
+        days_span = span_ns // _NS_PER_DAY + 1
         weeks_span = days_span / 7
         average_per_week = total_sessions / weeks_span if weeks_span > 0 else total_sessions
     else:
@@ -177,7 +284,7 @@ def calculate_study_statistics(progress_history: List[Dict]) -> Dict:
         'message': f'Great progress! You have completed {total_sessions} study sessions.'
     }
     
-    logger.info(f"Statistics calculated: {stats}")
+    logger.debug("Statistics calculated: %s", stats)
     return stats
 
 
@@ -198,16 +305,20 @@ def generate_quiz_questions(topic: str, difficulty: str = 'medium', count: int =
     # This is a simplified implementation
     # In a real system, this could use an LLM or question database
     
-    questions = []
-    for i in range(count):
-        question = {
-            'id': i + 1,
+    # The shared fields are interned so every question references one string
+    topic = sys.intern(topic)
+    difficulty = sys.intern(difficulty)
+    question_type = sys.intern('multiple_choice')
+    questions = [
+        {
+            'id': i,
             'topic': topic,
             'difficulty': difficulty,
-            'question': f'Sample question {i + 1} about {topic}',
-            'type': 'multiple_choice'
+            'question': f'Sample question {i} about {topic}',
+            'type': question_type
         }
-        questions.append(question)
+        for i in range(1, count + 1)
+    ]
     
-    logger.info(f"Generated {count} {difficulty} questions for {topic}")
+    logger.info("Generated %s %s questions for %s", count, difficulty, topic)
     return questions